@@ -4,11 +4,16 @@ Database connection and utilities for VetPath
 
 import re
 import sqlite3
+import time
+from functools import lru_cache, wraps
 from pathlib import Path
 from contextlib import contextmanager
 
 DATABASE_PATH = Path(__file__).parent / "vetpath.db"
 
+# Seconds between checks of the catalog version by catalog_cache lookups
+CATALOG_VERSION_CHECK_INTERVAL = 5.0
+
 
 def get_connection() -> sqlite3.Connection:
     """Get a database connection with row factory enabled"""
@@ -27,6 +32,61 @@ def get_db():
         conn.close()
 
 
+def get_catalog_version() -> int:
+    """Version of the occupation catalog, bumped each time the database is seeded"""
+    with get_db() as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def bump_catalog_version(conn: sqlite3.Connection) -> None:
+    """Mark the catalog as changed so running servers drop cached lookups"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    # PRAGMA values can't be bound as parameters
+    conn.execute(f"PRAGMA user_version = {int(version) + 1}")
+
+
+_catalog_caches = []
+_catalog_version = None
+_catalog_checked_at = float("-inf")
+
+
+def _check_catalog_version() -> None:
+    """Clear every catalog_cache if the catalog was reseeded since the last check"""
+    global _catalog_version, _catalog_checked_at
+    now = time.monotonic()
+    if now - _catalog_checked_at < CATALOG_VERSION_CHECK_INTERVAL:
+        return
+    _catalog_checked_at = now
+    version = get_catalog_version()
+    if version != _catalog_version:
+        for cached in _catalog_caches:
+            cached.cache_clear()
+        _catalog_version = version
+
+
+def catalog_cache(maxsize: int = 128):
+    """
+    lru_cache for lookups of seeded catalog data.
+
+    Reseeding (e.g. running seed_database.py while the server is up) bumps
+    the catalog version, and every catalog_cache is cleared within
+    CATALOG_VERSION_CHECK_INTERVAL seconds of the next lookup.
+    """
+    def decorator(func):
+        cached = lru_cache(maxsize=maxsize)(func)
+        _catalog_caches.append(cached)
+
+        @wraps(func)
+        def wrapper(*args):
+            _check_catalog_version()
+            return cached(*args)
+
+        wrapper.cache_clear = cached.cache_clear
+        wrapper.cache_info = cached.cache_info
+        return wrapper
+    return decorator
+
+
 def init_database():
     """Initialize the database schema"""
     with get_db() as conn:
@@ -84,6 +144,15 @@ def init_database():
             )
         """)
 
+        # Cached AI responses, keyed by a hash of the prompt inputs
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ai_response_cache (
+                cache_key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
         # Create indexes for faster queries
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_occupation_skills_code
@@ -97,6 +166,13 @@ def init_database():
             CREATE INDEX IF NOT EXISTS idx_crosswalk_mos
             ON military_crosswalk(mos_code)
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ai_response_cache_expires
+            ON ai_response_cache(expires_at)
+        """)
+
+        # Drop AI responses that expired while the server was down
+        cursor.execute("DELETE FROM ai_response_cache WHERE expires_at <= ?", (time.time(),))
 
         conn.commit()
 
@@ -122,60 +198,52 @@ def get_occupation_skills(code: str) -> list[str]:
         cursor.execute(
             """SELECT skill_name FROM occupation_skills
                WHERE occupation_code = ?
-               ORDER BY importance_level DESC""",
+               ORDER BY importance_level DESC, id""",
             (code,)
         )
         return [row["skill_name"] for row in cursor.fetchall()]
 
 
-def search_occupations_by_skills(skills: list[str], limit: int = 10) -> list[dict]:
-    """Search occupations that match given skills"""
+def get_occupations_by_codes_bulk(codes: list[str]) -> dict[str, dict]:
+    """Get occupation details for many O*NET codes in one query"""
+    if not codes:
+        return {}
     with get_db() as conn:
         cursor = conn.cursor()
+        placeholders = ",".join("?" * len(codes))
+        cursor.execute(
+            f"SELECT * FROM occupations WHERE occupation_code IN ({placeholders})",
+            list(codes)
+        )
+        return {row["occupation_code"]: dict(row) for row in cursor.fetchall()}
 
-        normalized = [s.strip().lower() for s in skills if s and s.strip()]
-        if not normalized:
-            return []
-
-        # Create placeholders for the IN clause
-        placeholders = ",".join("?" * len(normalized))
 
-        query = f"""
-            SELECT
-                o.*,
-                COUNT(DISTINCT os.skill_name) as matching_skills,
-                (COUNT(DISTINCT os.skill_name) * 1.0 /
-                    (SELECT COUNT(*) FROM occupation_skills os2
-                     WHERE os2.occupation_code = o.occupation_code)) as match_score
-            FROM occupations o
-            JOIN occupation_skills os ON o.occupation_code = os.occupation_code
-            WHERE LOWER(os.skill_name) IN ({placeholders})
-            GROUP BY o.occupation_code
-            ORDER BY
-                CASE
-                    WHEN o.industry IN ('manufacturing', 'construction', 'technology', 'logistics', 'energy')
-                    THEN 0 ELSE 1
-                END,
-                match_score DESC,
-                o.median_wage DESC
-            LIMIT ?
-        """
+def get_occupation_skills_bulk(codes: list[str]) -> dict[str, list[str]]:
+    """Get skills for many occupations in one query, keyed by occupation code"""
+    if not codes:
+        return {}
+    with get_db() as conn:
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(codes))
+        cursor.execute(
+            f"""SELECT occupation_code, skill_name FROM occupation_skills
+               WHERE occupation_code IN ({placeholders})
+               ORDER BY importance_level DESC, id""",
+            list(codes)
+        )
+        skills_by_code: dict[str, list[str]] = {}
+        for row in cursor.fetchall():
+            skills_by_code.setdefault(row["occupation_code"], []).append(row["skill_name"])
+        return skills_by_code
 
-        # Lowercase all skills for matching
-        params = normalized + [limit]
-        cursor.execute(query, params)
 
-        results = []
-        for row in cursor.fetchall():
-            result = dict(row)
-            match_score = result.pop("match_score", 0) or 0
-            result["skill_match_score"] = round(match_score * 100, 1)
-            results.append(result)
+def search_occupations_by_skill_tokens(skills: list[str], limit: int = 10) -> list[dict]:
+    """Fallback search: token-based partial matching against skill names, titles, and descriptions"""
+    with get_db() as conn:
+        cursor = conn.cursor()
 
-        if results:
-            return results
+        normalized = [s.strip().lower() for s in skills if s and s.strip()]
 
-        # Fallback: token-based partial matching against skill names, titles, and descriptions
         tokens: list[str] = []
         for skill in normalized:
             tokens.extend([t for t in re.split(r"[^a-z0-9]+", skill) if len(t) >= 3])
@@ -258,6 +326,14 @@ def get_training_for_skill(skill: str) -> dict | None:
     return None
 
 
+def get_training_skill_names() -> list[str]:
+    """Get the distinct lowercase skill names that have training resources"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT LOWER(skill_name) AS skill_name FROM training_resources")
+        return [row["skill_name"] for row in cursor.fetchall()]
+
+
 def get_crosswalk_for_mos(mos_code: str, branch: str = None) -> list[dict]:
     """Get civilian occupation matches for a military MOS code"""
     with get_db() as conn:
@@ -283,3 +359,30 @@ def get_crosswalk_for_mos(mos_code: str, branch: str = None) -> list[dict]:
             )
 
         return [dict(row) for row in cursor.fetchall()]
+
+
+def get_cached_response(cache_key: str) -> str | None:
+    """Get a cached AI response if present and not expired"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT response FROM ai_response_cache WHERE cache_key = ? AND expires_at > ?",
+            (cache_key, time.time())
+        )
+        row = cursor.fetchone()
+        if row:
+            return row["response"]
+    return None
+
+
+def set_cached_response(cache_key: str, response: str, ttl_seconds: int) -> None:
+    """Store an AI response for ttl_seconds, purging expired responses"""
+    now = time.time()
+    with get_db() as conn:
+        conn.execute("DELETE FROM ai_response_cache WHERE expires_at <= ?", (now,))
+        conn.execute(
+            """INSERT OR REPLACE INTO ai_response_cache (cache_key, response, expires_at)
+               VALUES (?, ?, ?)""",
+            (cache_key, response, now + ttl_seconds)
+        )
+        conn.commit()
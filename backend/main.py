@@ -14,12 +14,15 @@ from pathlib import Path
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 
 from models import (
     ParseRequest, ParseResponse, ParsedSkills,
+    ParseBatchRequest, ParseBatchResponse,
     MatchRequest, MatchResponse,
     ResumeRequest, ResumeResponse,
+    ResumeBatchRequest, ResumeBatchResponse,
     GapRequest, GapResponse,
     MilitaryProfile, CareerMatch
 )
@@ -27,10 +30,19 @@ from database import init_database, get_occupation_by_code, get_occupation_skill
 from services import (
     parse_military_experience,
     match_careers,
-    generate_resume,
     analyze_gaps
 )
-from services.matcher import match_from_parsed_skills, match_from_mos, get_career_details
+from services.matcher import (
+    match_from_parsed_skills,
+    match_from_mos,
+    get_career_details,
+)
+from services.parser import parse_military_experience_batch
+from services.resume import (
+    generate_resume_async,
+    generate_resume_stream,
+    generate_resumes_batch,
+)
 from services.gaps import get_career_readiness_score, get_quick_wins
 
 # Load environment variables
@@ -40,9 +52,12 @@ load_dotenv()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize database on startup"""
-    # Initialize database if it doesn't exist
+    # Initialize database if it doesn't exist; existing databases still get
+    # any tables added since they were created
     db_path = Path(__file__).parent / "vetpath.db"
-    if not db_path.exists():
+    if db_path.exists():
+        init_database()
+    else:
         print("Initializing database...")
         init_database()
         # Run seeder
@@ -130,6 +145,40 @@ async def parse_experience(request: ParseRequest):
         )
 
 
+@app.post("/api/parse/batch", response_model=ParseBatchResponse)
+async def parse_experience_batch(request: ParseBatchRequest):
+    """
+    Parse several military experience descriptions in one request.
+
+    Descriptions are parsed concurrently, so a batch takes about as long
+    as its slowest entry.
+    """
+    if not request.experiences or len(request.experiences) > 20:
+        raise HTTPException(
+            status_code=400,
+            detail="Please provide between 1 and 20 experience descriptions"
+        )
+    if any(not e or len(e.strip()) < 10 for e in request.experiences):
+        raise HTTPException(
+            status_code=400,
+            detail="Please provide a more detailed experience description"
+        )
+
+    try:
+        results = await parse_military_experience_batch(request.experiences)
+        return ParseBatchResponse(
+            results=[
+                ParseResponse(skills=skills, raw_text=text)
+                for skills, text in zip(results, request.experiences)
+            ]
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error parsing experience: {str(e)}"
+        )
+
+
 # ============================================================================
 # Career Matching
 # ============================================================================
@@ -251,11 +300,12 @@ async def create_resume(request: ResumeRequest):
         )
 
     try:
-        resume_text = generate_resume(
+        resume_text = await generate_resume_async(
             profile=request.profile,
             parsed_skills=request.parsed_skills,
             target_job=request.target_job,
-            target_company=request.target_company
+            target_company=request.target_company,
+            regenerate=request.regenerate
         )
         return ResumeResponse(
             resume_text=resume_text,
@@ -268,6 +318,70 @@ async def create_resume(request: ResumeRequest):
         )
 
 
+@app.post("/api/resume/stream")
+async def create_resume_stream(request: ResumeRequest):
+    """
+    Generate a resume and stream it back as Markdown text.
+
+    Same input as /api/resume; text is sent as it is written so the client
+    can render the resume progressively.
+    """
+    if not request.target_job:
+        raise HTTPException(
+            status_code=400,
+            detail="Please specify a target job"
+        )
+
+    return StreamingResponse(
+        generate_resume_stream(
+            profile=request.profile,
+            parsed_skills=request.parsed_skills,
+            target_job=request.target_job,
+            target_company=request.target_company,
+            regenerate=request.regenerate
+        ),
+        media_type="text/markdown"
+    )
+
+
+@app.post("/api/resume/batch", response_model=ResumeBatchResponse)
+async def create_resume_batch(request: ResumeBatchRequest):
+    """
+    Generate several resumes in one request.
+
+    Resumes are generated concurrently, so a batch takes about as long as
+    its slowest entry. Entries for the same profile and company share one
+    AI request per few target jobs.
+    """
+    if not request.requests or len(request.requests) > 10:
+        raise HTTPException(
+            status_code=400,
+            detail="Please provide between 1 and 10 resume requests"
+        )
+    if any(not r.target_job for r in request.requests):
+        raise HTTPException(
+            status_code=400,
+            detail="Please specify a target job"
+        )
+
+    try:
+        resume_texts = await generate_resumes_batch([
+            (r.profile, r.parsed_skills, r.target_job, r.target_company, r.regenerate)
+            for r in request.requests
+        ])
+        return ResumeBatchResponse(
+            results=[
+                ResumeResponse(resume_text=text, format="markdown")
+                for text in resume_texts
+            ]
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating resumes: {str(e)}"
+        )
+
+
 # ============================================================================
 # Gap Analysis
 # ============================================================================
@@ -45,6 +45,16 @@ class ParseResponse(BaseModel):
     raw_text: str
 
 
+class ParseBatchRequest(BaseModel):
+    """Request to parse several military experience descriptions"""
+    experiences: list[str]
+
+
+class ParseBatchResponse(BaseModel):
+    """Response from batch skills parser"""
+    results: list[ParseResponse]
+
+
 class CareerMatch(BaseModel):
     """A matched civilian career"""
     occupation_code: str
@@ -77,6 +87,8 @@ class ResumeRequest(BaseModel):
     parsed_skills: ParsedSkills
     target_job: str
     target_company: Optional[str] = None
+    # Skip the cached resume for identical inputs and generate a fresh one
+    regenerate: bool = False
 
 
 class ResumeResponse(BaseModel):
@@ -85,6 +97,16 @@ class ResumeResponse(BaseModel):
     format: str = "markdown"
 
 
+class ResumeBatchRequest(BaseModel):
+    """Request to generate several resumes"""
+    requests: list[ResumeRequest]
+
+
+class ResumeBatchResponse(BaseModel):
+    """Response from batch resume generator"""
+    results: list[ResumeResponse]
+
+
 class TrainingRecommendation(BaseModel):
     """A training recommendation for a skill gap"""
     skill_gap: str
@@ -98,9 +120,12 @@ class TrainingRecommendation(BaseModel):
 class GapAnalysis(BaseModel):
     """Skills gap analysis result"""
     gaps: list[str]
-    recommendations: list[TrainingRecommendation]
+    recommendations: tuple[TrainingRecommendation, ...]
     estimated_time_to_ready: str
     match_percentage: float
+    occupation_title: Optional[str] = None
+    skills_matched: int = 0
+    skills_required: int = 0
     development_summary: Optional[str] = None
     development_steps: list[str] = []
     resource_suggestions: list[str] = []
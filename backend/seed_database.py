@@ -16,7 +16,7 @@ import re
 from collections import defaultdict
 from pathlib import Path
 
-from database import init_database, get_db
+from database import init_database, get_db, bump_catalog_version
 
 DATA_DIR = Path(__file__).parent / "data"
 ONET_DATA_DIR = Path(os.getenv("ONET_DATA_DIR", DATA_DIR / "onet"))
@@ -354,6 +354,7 @@ def seed_database():
                 resource.get("url")
             ))
 
+        bump_catalog_version(conn)
         conn.commit()
 
     print("Database seeded successfully!")
@@ -7,15 +7,21 @@ Uses:
 - Extended thinking enabled with 4096 max reasoning tokens
 
 Per OpenRouter docs:
-- max_tokens controls visible output tokens
 - reasoning.max_tokens caps reasoning/thinking budget
-- max_tokens must be > reasoning.max_tokens
+- max_tokens must be > reasoning.max_tokens, since reasoning counts against it
+
+Callers that check finish_reason (return_finish_reason=True, and
+stream_ai_simple) pass max_tokens as the visible output budget, and the
+reasoning budget is added on top. Other calls send max_tokens as the total,
+raised if needed to leave 1000 tokens beyond the reasoning budget.
 """
 
+import asyncio
 import os
 import json
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import Iterator, Optional, Union
 
 # OpenRouter configuration
 OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
@@ -23,6 +29,26 @@ DEFAULT_MODEL = "anthropic/claude-haiku-4.5"
 MAX_REASONING_TOKENS = 4096
 # Set high to effectively not limit output (must be > reasoning tokens per docs)
 DEFAULT_MAX_TOKENS = 16000
+# JSON mode; providers that don't support it ignore the parameter
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+# Pooled connections kept open to OpenRouter; covers the concurrent batch paths
+MAX_POOLED_CONNECTIONS = 16
+
+# Shared session so calls reuse keep-alive connections instead of paying a
+# TCP + TLS handshake on every request
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_maxsize=MAX_POOLED_CONNECTIONS))
+
+
+def cached_text_block(text: str) -> dict:
+    """
+    Build a text content block marked for Anthropic prompt caching.
+
+    OpenRouter passes cache_control through to Anthropic, which caches the
+    prompt prefix up to and including this block (5 minute TTL). Prefixes
+    shorter than the model's minimum cacheable length are sent uncached.
+    """
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
 
 
 def get_api_key() -> Optional[str]:
@@ -35,34 +61,16 @@ def is_ai_available() -> bool:
     return bool(get_api_key())
 
 
-def call_ai(
+def _build_request(
     messages: list[dict],
-    system_prompt: str = None,
-    max_tokens: int = DEFAULT_MAX_TOKENS,
-    reasoning_tokens: int = MAX_REASONING_TOKENS,
-    model: str = DEFAULT_MODEL,
-) -> Optional[str]:
-    """
-    Call OpenRouter API with Claude model and extended thinking.
-
-    Per OpenRouter docs (https://openrouter.ai/docs/use-cases/reasoning-tokens):
-    - max_tokens: controls visible output tokens
-    - reasoning.max_tokens: caps reasoning/thinking budget
-    - max_tokens must be strictly greater than reasoning.max_tokens
-
-    Args:
-        messages: List of message dicts with 'role' and 'content'
-        system_prompt: Optional system prompt
-        max_tokens: Maximum tokens for visible output (default: 16000, high to not limit)
-        reasoning_tokens: Max tokens for reasoning/thinking (default: 4096)
-        model: Model to use (default: anthropic/claude-haiku-4.5)
-
-    Returns:
-        Response text or None if error
-
-    Raises:
-        Exception: If API call fails
-    """
+    system_prompt: Union[str, list[dict], None],
+    max_tokens: int,
+    reasoning_tokens: int,
+    model: str,
+    response_format: Optional[dict],
+    visible_budget: bool = False,
+) -> tuple[dict, dict]:
+    """Build the headers and JSON payload for a chat completions request"""
     api_key = get_api_key()
     if not api_key:
         raise ValueError("OPENROUTER_API_KEY environment variable not set")
@@ -83,18 +91,69 @@ def call_ai(
         ]
 
     # Build payload per OpenRouter docs
-    # max_tokens must be > reasoning.max_tokens
+    # max_tokens must be > reasoning.max_tokens; reasoning counts against it,
+    # so a visible budget gets the reasoning budget added on top
+    if visible_budget:
+        total_tokens = max_tokens + reasoning_tokens
+    else:
+        total_tokens = max(max_tokens, reasoning_tokens + 1000)  # Ensure room for output
     payload = {
         "model": model,
         "messages": final_messages,
-        "max_tokens": max(max_tokens, reasoning_tokens + 1000),  # Ensure room for output
+        "max_tokens": total_tokens,
         "reasoning": {
             "max_tokens": reasoning_tokens
         }
     }
+    if response_format:
+        payload["response_format"] = response_format
+
+    return headers, payload
+
+
+def call_ai(
+    messages: list[dict],
+    system_prompt: Union[str, list[dict], None] = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    reasoning_tokens: int = MAX_REASONING_TOKENS,
+    model: str = DEFAULT_MODEL,
+    response_format: Optional[dict] = None,
+    return_finish_reason: bool = False,
+) -> Union[Optional[str], tuple[Optional[str], Optional[str]]]:
+    """
+    Call OpenRouter API with Claude model and extended thinking.
+
+    Per OpenRouter docs (https://openrouter.ai/docs/use-cases/reasoning-tokens):
+    - reasoning.max_tokens: caps reasoning/thinking budget
+    - max_tokens must be strictly greater than reasoning.max_tokens
+    With return_finish_reason, the request's max_tokens is the visible budget
+    plus the reasoning budget.
+
+    Args:
+        messages: List of message dicts with 'role' and 'content'
+        system_prompt: Optional system prompt, as text or content blocks
+            (see cached_text_block)
+        max_tokens: Maximum tokens for visible output (default: 16000, high to not limit)
+        reasoning_tokens: Max tokens for reasoning/thinking (default: 4096)
+        model: Model to use (default: anthropic/claude-haiku-4.5)
+        response_format: Optional output format, e.g. {"type": "json_object"}
+        return_finish_reason: Also return the provider's finish_reason, which
+            is "length" when the output was cut off at max_tokens
+
+    Returns:
+        Response text or None if error, or (text, finish_reason) if
+        return_finish_reason is set
+
+    Raises:
+        Exception: If API call fails
+    """
+    headers, payload = _build_request(
+        messages, system_prompt, max_tokens, reasoning_tokens, model, response_format,
+        visible_budget=return_finish_reason,
+    )
 
     try:
-        response = requests.post(
+        response = _SESSION.post(
             OPENROUTER_API_URL,
             headers=headers,
             json=payload,
@@ -105,13 +164,17 @@ def call_ai(
         result = response.json()
 
         # Extract the response text
+        text, finish_reason = None, None
         if "choices" in result and len(result["choices"]) > 0:
             choice = result["choices"][0]
+            finish_reason = choice.get("finish_reason")
             if "message" in choice and "content" in choice["message"]:
-                return choice["message"]["content"]
+                text = choice["message"]["content"]
 
         # Fallback: return raw result if structure is different
-        return json.dumps(result)
+        if text is None:
+            text = json.dumps(result)
+        return (text, finish_reason) if return_finish_reason else text
 
     except requests.exceptions.Timeout:
         raise Exception("AI request timed out. Please try again.")
@@ -127,20 +190,24 @@ def call_ai(
 
 
 def call_ai_simple(
-    user_message: str,
-    system_prompt: str = None,
+    user_message: Union[str, list[dict]],
+    system_prompt: Union[str, list[dict], None] = None,
     max_tokens: int = DEFAULT_MAX_TOKENS,
-) -> Optional[str]:
+    json_mode: bool = False,
+    return_finish_reason: bool = False,
+) -> Union[Optional[str], tuple[Optional[str], Optional[str]]]:
     """
     Simplified AI call with just a user message.
 
     Args:
-        user_message: The user's message/prompt
-        system_prompt: Optional system prompt
+        user_message: The user's message/prompt, as text or content blocks
+        system_prompt: Optional system prompt, as text or content blocks
         max_tokens: Maximum output tokens (default: 16000, high to not limit)
+        json_mode: Ask the provider to return a bare JSON object
+        return_finish_reason: Also return the provider's finish_reason
 
     Returns:
-        Response text
+        Response text, or (text, finish_reason) if return_finish_reason is set
     """
     messages = [{"role": "user", "content": user_message}]
     return call_ai(
@@ -148,4 +215,117 @@ def call_ai_simple(
         system_prompt=system_prompt,
         max_tokens=max_tokens,
         reasoning_tokens=MAX_REASONING_TOKENS,
+        response_format=JSON_RESPONSE_FORMAT if json_mode else None,
+        return_finish_reason=return_finish_reason,
+    )
+
+
+async def call_ai_simple_async(
+    user_message: Union[str, list[dict]],
+    system_prompt: Union[str, list[dict], None] = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    json_mode: bool = False,
+    return_finish_reason: bool = False,
+) -> Union[Optional[str], tuple[Optional[str], Optional[str]]]:
+    """
+    Async variant of call_ai_simple.
+
+    Runs the blocking HTTP request in a worker thread so several calls can be
+    in flight at once without blocking the event loop.
+
+    Args:
+        user_message: The user's message/prompt, as text or content blocks
+        system_prompt: Optional system prompt, as text or content blocks
+        max_tokens: Maximum output tokens (default: 16000, high to not limit)
+        json_mode: Ask the provider to return a bare JSON object
+        return_finish_reason: Also return the provider's finish_reason
+
+    Returns:
+        Response text, or (text, finish_reason) if return_finish_reason is set
+    """
+    return await asyncio.to_thread(
+        call_ai_simple,
+        user_message=user_message,
+        system_prompt=system_prompt,
+        max_tokens=max_tokens,
+        json_mode=json_mode,
+        return_finish_reason=return_finish_reason,
+    )
+
+
+def stream_ai_simple(
+    user_message: Union[str, list[dict]],
+    system_prompt: Union[str, list[dict], None] = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+) -> Iterator[str]:
+    """
+    Streaming variant of call_ai_simple.
+
+    Requests server-sent events and yields visible text as it arrives, so
+    callers can show output long before generation finishes. Reasoning
+    deltas are skipped. A stream that closes before its [DONE] marker, or that
+    was cut off at max_tokens, raises after its text has been yielded, so
+    partial output is never mistaken for a complete response.
+
+    Args:
+        user_message: The user's message/prompt, as text or content blocks
+        system_prompt: Optional system prompt, as text or content blocks
+        max_tokens: Maximum output tokens (default: 16000, high to not limit)
+
+    Yields:
+        Response text chunks
+
+    Raises:
+        Exception: If API call fails
+    """
+    headers, payload = _build_request(
+        [{"role": "user", "content": user_message}],
+        system_prompt, max_tokens, MAX_REASONING_TOKENS, DEFAULT_MODEL, None,
+        visible_budget=True,
     )
+    payload["stream"] = True
+
+    try:
+        with _SESSION.post(
+            OPENROUTER_API_URL,
+            headers=headers,
+            json=payload,
+            timeout=120,
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            # text/event-stream arrives without a charset, which requests
+            # would otherwise decode as ISO-8859-1
+            response.encoding = "utf-8"
+            completed = False
+            finish_reason = None
+            for line in response.iter_lines(decode_unicode=True):
+                # Lines starting with ":" are keep-alive comments
+                if not line or not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    completed = True
+                    break
+
+                chunk = json.loads(data)
+                if "error" in chunk:
+                    raise Exception(f"AI API error: {chunk['error']}")
+                choices = chunk.get("choices") or []
+                if choices:
+                    finish_reason = choices[0].get("finish_reason") or finish_reason
+                    text = choices[0].get("delta", {}).get("content")
+                    if text:
+                        yield text
+
+            if not completed:
+                raise Exception("AI stream ended before the response was complete")
+            if finish_reason == "length":
+                raise Exception("AI response was cut off at the token limit")
+
+    except requests.exceptions.Timeout:
+        raise Exception("AI request timed out. Please try again.")
+    except requests.exceptions.HTTPError as e:
+        raise Exception(f"AI API error: {e.response.status_code} - {e.response.text}")
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"AI request failed: {str(e)}")
@@ -2,16 +2,100 @@
 Gap analysis service - identifies skill gaps and recommends training
 """
 
+import difflib
 import json
+import logging
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-from database import get_occupation_skills, get_training_for_skill, get_occupation_by_code
+from database import (
+    catalog_cache,
+    get_occupation_skills,
+    get_training_for_skill,
+    get_training_skill_names,
+    get_occupation_by_code,
+)
 from models import GapAnalysis, TrainingRecommendation
 from services.ai_client import is_ai_available, call_ai_simple
+from services.skills_vocab import skill_id, lookup_skill_id, skill_name
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_skill(skill: str) -> str:
+    """Canonical form used for every skill comparison and lookup key"""
+    return skill.lower().strip()
+
+
+def _training_lookup_workers() -> int:
+    """Read TRAINING_LOOKUP_WORKERS, falling back to 1 for invalid values"""
+    value = os.getenv("TRAINING_LOOKUP_WORKERS", "1")
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning("Ignoring invalid TRAINING_LOOKUP_WORKERS=%r, using 1", value)
+        return 1
+
+
+# Worker threads for per-gap training lookups; only worth enabling when the
+# database is remote (each lookup opens its own connection)
+TRAINING_LOOKUP_WORKERS = _training_lookup_workers()
+
+# Minimum similarity for treating a skill as a variant of a training resource skill
+FUZZY_TRAINING_CUTOFF = 0.85
+
+
+@catalog_cache(maxsize=1)
+def _training_skill_names() -> tuple[str, ...]:
+    return tuple(get_training_skill_names())
+
+
+@catalog_cache(maxsize=4096)
+def _find_training(skill_lower: str) -> Optional[dict]:
+    """
+    Find a training resource for a normalized skill, falling back to the
+    closest training skill name (e.g. "project-management") on an exact miss.
+    """
+    db_training = get_training_for_skill(skill_lower)
+    if db_training:
+        return db_training
+
+    close = difflib.get_close_matches(
+        skill_lower, _training_skill_names(), n=1, cutoff=FUZZY_TRAINING_CUTOFF
+    )
+    if close:
+        return get_training_for_skill(close[0])
+    return None
+
+
+# Template for skills without a known training resource; copied per gap
+_GENERIC_RECOMMENDATION = TrainingRecommendation(
+    skill_gap="",
+    certification="",
+    estimated_time="1-6 months",
+    cost="Varies - check VA benefits eligibility",
+    provider="Various training providers",
+    va_eligible=True
+)
+
+
+def clear_training_cache() -> None:
+    """Drop cached training lookups (reseeds are picked up automatically)"""
+    _training_skill_names.cache_clear()
+    _find_training.cache_clear()
 
 
 def _extract_json_from_text(text: str) -> dict:
+    # JSON mode responses are a bare object; parse directly
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return data
+    except json.JSONDecodeError:
+        pass
+
     match = re.search(r'\{[\s\S]*\}', text)
     if match:
         try:
@@ -25,7 +109,7 @@ def _build_ai_development_plan(
     occupation_title: str,
     match_percentage: float,
     gaps: list[str],
-    recommendations: list[TrainingRecommendation],
+    recommendations: tuple[TrainingRecommendation, ...],
 ) -> tuple[Optional[str], list[str], list[str]]:
     if not is_ai_available():
         return None, [], []
@@ -50,7 +134,7 @@ Constraints:
 """
 
     try:
-        response = call_ai_simple(user_message=prompt, max_tokens=1200)
+        response = call_ai_simple(user_message=prompt, max_tokens=1200, json_mode=True)
         if not response:
             return None, [], []
         data = _extract_json_from_text(response)
@@ -66,8 +150,6 @@ Constraints:
         return None, [], []
 
 
-
-
 def analyze_gaps(
     veteran_skills: list[str],
     target_occupation_code: str
@@ -84,46 +166,55 @@ def analyze_gaps(
     """
     # Get required skills for target occupation
     required_skills = get_occupation_skills(target_occupation_code)
+    occupation = get_occupation_by_code(target_occupation_code)
+    occupation_title = occupation.get("occupation_title") if occupation else None
 
     if not required_skills:
-        # If occupation not found, return empty analysis
+        # If occupation not found or has no skills, return empty analysis
         return GapAnalysis(
             gaps=[],
-            recommendations=[],
+            recommendations=(),
             estimated_time_to_ready="Unable to determine",
-            match_percentage=0.0
+            match_percentage=0.0,
+            occupation_title=occupation_title,
         )
 
-    # Normalize skills for comparison (lowercase)
-    veteran_set = {s.lower().strip() for s in veteran_skills}
-    required_set = {s.lower().strip() for s in required_skills}
+    # Normalize skills and compare in integer ID space. Required skills are
+    # registered first; veteran skills absent from the vocabulary can't match.
+    required_set = frozenset(skill_id(_normalize_skill(s)) for s in required_skills)
+    veteran_set = frozenset(
+        sid for sid in (lookup_skill_id(_normalize_skill(s)) for s in veteran_skills)
+        if sid is not None
+    )
 
     # Find matching and missing skills
-    matching_skills = veteran_set.intersection(required_set)
-    missing_skills = required_set - veteran_set
+    matching_skills = veteran_set & required_set
+    missing_skills = [skill_name(sid) for sid in required_set - veteran_set]
 
     # Calculate match percentage
     match_pct = (len(matching_skills) / len(required_set) * 100) if required_set else 0
 
     # Get training recommendations for each gap
-    recommendations = []
-    for skill in missing_skills:
-        rec = _get_training_recommendation(skill)
-        if rec:
-            recommendations.append(rec)
-
-    # Sort recommendations by importance (based on skill order in required_skills)
-    skill_importance = {s.lower(): i for i, s in enumerate(required_skills)}
-    recommendations.sort(key=lambda r: skill_importance.get(r.skill_gap.lower(), 999))
+    workers = min(TRAINING_LOOKUP_WORKERS, len(missing_skills))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            lookups = list(executor.map(_get_training_recommendation, missing_skills))
+    else:
+        lookups = [_get_training_recommendation(skill) for skill in missing_skills]
+    recommendations = [rec for rec in lookups if rec]
+
+    # Sort recommendations by importance (based on skill order in required_skills).
+    # skill_gap is already normalized, so key the lookup the same way.
+    skill_importance = {_normalize_skill(s): i for i, s in enumerate(required_skills)}
+    recommendations = tuple(
+        sorted(recommendations, key=lambda r: skill_importance.get(r.skill_gap, 999))
+    )
 
     # Calculate estimated time to ready
     time_to_ready = _calculate_time_to_ready(recommendations, match_pct)
 
-    occupation = get_occupation_by_code(target_occupation_code)
-    occupation_title = occupation.get("occupation_title", "Target Role") if occupation else "Target Role"
-
     development_summary, development_steps, resource_suggestions = _build_ai_development_plan(
-        occupation_title=occupation_title,
+        occupation_title=occupation_title or "Target Role",
         match_percentage=round(match_pct, 1),
         gaps=list(missing_skills),
         recommendations=recommendations,
@@ -134,6 +225,9 @@ def analyze_gaps(
         recommendations=recommendations,
         estimated_time_to_ready=time_to_ready,
         match_percentage=round(match_pct, 1),
+        occupation_title=occupation_title,
+        skills_matched=len(matching_skills),
+        skills_required=len(required_set),
         development_summary=development_summary,
         development_steps=development_steps,
         resource_suggestions=resource_suggestions,
@@ -150,10 +244,10 @@ def _get_training_recommendation(skill: str) -> Optional[TrainingRecommendation]
     Returns:
         TrainingRecommendation or None
     """
-    skill_lower = skill.lower().strip()
+    skill_lower = _normalize_skill(skill)
 
-    # First, check database
-    db_training = get_training_for_skill(skill_lower)
+    # First, check database (exact match, then closest variant)
+    db_training = _find_training(skill_lower)
     if db_training:
         return TrainingRecommendation(
             skill_gap=skill,
@@ -165,25 +259,21 @@ def _get_training_recommendation(skill: str) -> Optional[TrainingRecommendation]
         )
 
     # Generic recommendation for unknown skills
-    return TrainingRecommendation(
-        skill_gap=skill,
-        certification=f"{skill.title()} certification or training",
-        estimated_time="1-6 months",
-        cost="Varies - check VA benefits eligibility",
-        provider="Various training providers",
-        va_eligible=True
-    )
+    return _GENERIC_RECOMMENDATION.model_copy(update={
+        "skill_gap": skill,
+        "certification": f"{skill.title()} certification or training",
+    })
 
 
 def _calculate_time_to_ready(
-    recommendations: list[TrainingRecommendation],
+    recommendations: tuple[TrainingRecommendation, ...],
     current_match_pct: float
 ) -> str:
     """
     Calculate estimated time to become job-ready.
 
     Args:
-        recommendations: List of training recommendations
+        recommendations: Training recommendations, most important first
         current_match_pct: Current skill match percentage
 
     Returns:
@@ -198,32 +288,34 @@ def _calculate_time_to_ready(
     if not recommendations:
         return "Unable to determine"
 
+    # Can pursue multiple certifications in parallel
+    parallel_factor = 0.6
+
     # Parse time estimates and calculate
     total_months = 0
     for rec in recommendations[:3]:  # Consider top 3 gaps
         time_str = rec.estimated_time.lower()
         if "week" in time_str:
             # Extract weeks and convert to months
-            import re
             weeks = re.search(r'(\d+)', time_str)
             if weeks:
                 total_months += int(weeks.group(1)) / 4
         elif "month" in time_str:
             # Extract months
-            import re
             months = re.search(r'(\d+)', time_str)
             if months:
                 total_months += int(months.group(1))
         elif "year" in time_str:
-            import re
             years = re.search(r'(\d+)', time_str)
             if years:
                 total_months += int(years.group(1)) * 12
         else:
             total_months += 3  # Default estimate
 
-    # Can pursue multiple certifications in parallel
-    parallel_factor = 0.6
+        # Totals only grow, so once past the top bucket the answer is settled
+        if total_months * parallel_factor > 12:
+            return "12+ months"
+
     adjusted_months = total_months * parallel_factor
 
     if adjusted_months <= 2:
@@ -289,19 +381,17 @@ def get_career_readiness_score(
     Returns:
         Dict with readiness score and breakdown
     """
+    # The analysis already carries the occupation title and match counts,
+    # so no further database lookups are needed here
     analysis = analyze_gaps(veteran_skills, target_occupation_code)
-    occupation = get_occupation_by_code(target_occupation_code)
 
     # Calculate readiness score (0-100)
     base_score = analysis.match_percentage
 
     # Bonus for having more skills than minimum required
-    required_skills = get_occupation_skills(target_occupation_code)
-    veteran_set = {s.lower() for s in veteran_skills}
-    required_set = {s.lower() for s in required_skills}
-    matching = veteran_set.intersection(required_set)
-
-    bonus = min(10, (len(matching) - len(required_set) // 2) * 2) if len(matching) > len(required_set) // 2 else 0
+    matched = analysis.skills_matched
+    half_required = analysis.skills_required // 2
+    bonus = min(10, (matched - half_required) * 2) if matched > half_required else 0
     readiness_score = min(100, base_score + bonus)
 
     # Determine readiness level
@@ -323,9 +413,9 @@ def get_career_readiness_score(
         "level": level,
         "message": message,
         "match_percentage": analysis.match_percentage,
-        "skills_matched": len(matching),
-        "skills_required": len(required_set),
+        "skills_matched": analysis.skills_matched,
+        "skills_required": analysis.skills_required,
         "gaps_count": len(analysis.gaps),
         "estimated_time": analysis.estimated_time_to_ready,
-        "occupation_title": occupation.get("occupation_title", "Unknown") if occupation else "Unknown"
+        "occupation_title": analysis.occupation_title or "Unknown"
     }
@@ -2,14 +2,48 @@
 Career matching service - matches veteran skills to civilian careers
 """
 
+import heapq
 from typing import Optional
 from database import (
-    search_occupations_by_skills,
+    catalog_cache,
+    search_occupations_by_skill_tokens,
     get_occupation_by_code,
     get_occupation_skills,
+    get_occupations_by_codes_bulk,
+    get_occupation_skills_bulk,
     get_crosswalk_for_mos
 )
 from models import CareerMatch, ParsedSkills
+from services.skill_index import search_skill_index
+from services.skills_vocab import NormalizedSkills, normalize_skills
+
+
+@catalog_cache(maxsize=4096)
+def _cached_occ(code: str) -> Optional[tuple]:
+    occ = get_occupation_by_code(code)
+    return tuple(occ.items()) if occ else None
+
+
+@catalog_cache(maxsize=4096)
+def _cached_skills(code: str) -> tuple[str, ...]:
+    return tuple(get_occupation_skills(code))
+
+
+def _get_occupation(code: str) -> Optional[dict]:
+    """Cached get_occupation_by_code; returns a fresh dict per call"""
+    occ = _cached_occ(code)
+    return dict(occ) if occ else None
+
+
+def _get_skills(code: str) -> list[str]:
+    """Cached get_occupation_skills; returns a fresh list per call"""
+    return list(_cached_skills(code))
+
+
+def clear_occupation_cache() -> None:
+    """Drop cached occupation lookups (reseeds are picked up automatically)"""
+    _cached_occ.cache_clear()
+    _cached_skills.cache_clear()
 
 
 def match_careers(
@@ -31,42 +65,61 @@ def match_careers(
     Returns:
         List of CareerMatch objects sorted by match score
     """
+    # Normalize once at the boundary; downstream layers take the result as-is
+    return _match_normalized(normalize_skills(skills), preferences, limit)
+
+
+def _match_normalized(
+    skills: NormalizedSkills,
+    preferences: Optional[dict],
+    limit: int
+) -> list[CareerMatch]:
     if not skills:
         return []
 
-    # Get matching occupations from database
-    raw_matches = search_occupations_by_skills(skills, limit=limit * 2)
+    min_salary = preferences.get("min_salary") if preferences else None
+    industries = preferences.get("industries") if preferences else None
 
-    matches = []
-    for occ in raw_matches:
-        # Apply preference filters
-        if preferences:
-            if preferences.get("min_salary") and occ.get("median_wage", 0) < preferences["min_salary"]:
-                continue
-            if preferences.get("industries") and occ.get("industry") not in preferences["industries"]:
-                continue
-
-        # Get required skills for this occupation
-        required_skills = get_occupation_skills(occ["occupation_code"])
-
-        match = CareerMatch(
+    # Score exact skill matches in memory, with preferences applied as a
+    # vectorized filter before ranking
+    raw_matches = search_skill_index(
+        skills, limit=limit * 2, min_salary=min_salary, industries=industries
+    )
+
+    # Fall back to partial text matching, filtering the rows in Python
+    if not raw_matches:
+        raw_matches = [
+            occ for occ in search_occupations_by_skill_tokens(skills, limit=limit * 2)
+            if not (min_salary and occ.get("median_wage", 0) < min_salary)
+            and not (industries and occ.get("industry") not in industries)
+        ]
+
+    # Top matches by score, then by wage; only these become CareerMatch objects
+    top = heapq.nlargest(
+        limit,
+        raw_matches,
+        key=lambda occ: (float(occ.get("skill_match_score", 0)), occ.get("median_wage", 0)),
+    )
+
+    # Get required skills for the selected occupations in one query
+    skills_by_code = get_occupation_skills_bulk([occ["occupation_code"] for occ in top])
+
+    # Rows come from the seeded database, so skip per-field validation
+    return [
+        CareerMatch.model_construct(
             occupation_code=occ["occupation_code"],
             occupation_title=occ["occupation_title"],
             median_wage=occ.get("median_wage", 0),
             job_outlook=occ.get("job_outlook", "Unknown"),
             growth_rate=occ.get("growth_rate"),
-            skill_match_score=occ.get("skill_match_score", 0),
+            skill_match_score=float(occ.get("skill_match_score", 0)),
             industry=occ.get("industry", "Unknown"),
             description=occ.get("description", ""),
-            required_skills=required_skills,
+            required_skills=skills_by_code.get(occ["occupation_code"], []),
             education_required=occ.get("education_required", "Varies")
         )
-        matches.append(match)
-
-    # Sort by match score (descending), then by wage
-    matches.sort(key=lambda x: (-x.skill_match_score, -x.median_wage))
-
-    return matches[:limit]
+        for occ in top
+    ]
 
 
 def match_from_parsed_skills(
@@ -105,16 +158,8 @@ def match_from_parsed_skills(
             all_skills.append("cybersecurity")
             all_skills.append("risk assessment")
 
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_skills = []
-    for skill in all_skills:
-        skill_lower = skill.lower()
-        if skill_lower not in seen:
-            seen.add(skill_lower)
-            unique_skills.append(skill)
-
-    return match_careers(unique_skills, preferences, limit)
+    # Normalize and remove duplicates while preserving first-seen order
+    return _match_normalized(normalize_skills(all_skills), preferences, limit)
 
 
 def match_from_mos(
@@ -129,7 +174,8 @@ def match_from_mos(
     Args:
         mos_code: Military occupation code (e.g., "11B", "IT", "3D0X2")
         branch: Military branch (Army, Navy, Air Force, Marine Corps)
-        additional_skills: Additional skills to consider
+        additional_skills: Additional skills to consider; skill-based matches
+            are only searched when the crosswalk yields fewer than limit results
         limit: Maximum results
 
     Returns:
@@ -141,23 +187,33 @@ def match_from_mos(
     matches = []
     seen_codes = set()
 
-    # First, add direct crosswalk matches
+    # Keep the strongest crosswalk entry per occupation, then fetch all
+    # occupations and their skills in one query each
+    entries = []
     for entry in crosswalk_results:
         code = entry["civilian_occupation_code"]
         if code in seen_codes:
             continue
         seen_codes.add(code)
+        entries.append(entry)
 
-        occ = get_occupation_by_code(code)
+    codes = [entry["civilian_occupation_code"] for entry in entries]
+    occupations_by_code = get_occupations_by_codes_bulk(codes)
+    skills_by_code = get_occupation_skills_bulk(codes)
+
+    # First, add direct crosswalk matches
+    for entry in entries:
+        code = entry["civilian_occupation_code"]
+        occ = occupations_by_code.get(code)
         if not occ:
             continue
 
-        required_skills = get_occupation_skills(code)
+        required_skills = skills_by_code.get(code, [])
 
         # Calculate match score based on crosswalk strength
         base_score = entry.get("match_strength", 3) * 20  # 20-100 range
 
-        match = CareerMatch(
+        match = CareerMatch.model_construct(
             occupation_code=code,
             occupation_title=occ["occupation_title"],
             median_wage=occ.get("median_wage", 0),
@@ -171,17 +227,17 @@ def match_from_mos(
         )
         matches.append(match)
 
-    # If additional skills provided, add skill-based matches
-    if additional_skills:
-        skill_matches = match_careers(additional_skills, limit=limit)
+    # If additional skills provided, fill remaining slots with skill-based matches
+    if additional_skills and len(matches) < limit:
+        needed = limit - len(matches)
+        skill_matches = match_careers(additional_skills, limit=needed * 2)
         for match in skill_matches:
             if match.occupation_code not in seen_codes:
                 seen_codes.add(match.occupation_code)
                 matches.append(match)
 
-    # Sort and limit
-    matches.sort(key=lambda x: (-x.skill_match_score, -x.median_wage))
-    return matches[:limit]
+    # Top matches by score, then by wage
+    return heapq.nlargest(limit, matches, key=lambda x: (x.skill_match_score, x.median_wage))
 
 
 def get_career_details(occupation_code: str) -> Optional[CareerMatch]:
@@ -194,11 +250,11 @@ def get_career_details(occupation_code: str) -> Optional[CareerMatch]:
     Returns:
         CareerMatch object or None if not found
     """
-    occ = get_occupation_by_code(occupation_code)
+    occ = _get_occupation(occupation_code)
     if not occ:
         return None
 
-    required_skills = get_occupation_skills(occupation_code)
+    required_skills = _get_skills(occupation_code)
 
     return CareerMatch(
         occupation_code=occ["occupation_code"],
@@ -228,19 +284,20 @@ def calculate_skill_overlap(
     Returns:
         Tuple of (matching_skills, missing_skills, match_percentage)
     """
-    required_skills = get_occupation_skills(occupation_code)
+    required_skills = _get_skills(occupation_code)
 
-    # Normalize skills for comparison
-    veteran_set = {s.lower() for s in veteran_skills}
+    # Normalize skills for comparison, lowercasing each veteran skill once
+    veteran_pairs = [(s, s.lower()) for s in veteran_skills]
+    veteran_set = {sl for _, sl in veteran_pairs}
     required_set = {s.lower() for s in required_skills}
 
-    matching = veteran_set.intersection(required_set)
+    matching = veteran_set & required_set
     missing = required_set - veteran_set
 
     match_pct = (len(matching) / len(required_set) * 100) if required_set else 0
 
     return (
-        [s for s in veteran_skills if s.lower() in matching],
+        [s for s, sl in veteran_pairs if sl in matching],
         list(missing),
         round(match_pct, 1)
     )
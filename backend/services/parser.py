@@ -2,12 +2,20 @@
 AI-powered military experience parser using OpenRouter/Claude API
 """
 
+import asyncio
+import hashlib
 import json
 import re
+import sqlite3
+from collections import defaultdict
+from functools import lru_cache
 from typing import Optional
 
+import ahocorasick
+
+from database import get_cached_response, set_cached_response
 from models import ParsedSkills, Leadership
-from services.ai_client import is_ai_available, call_ai_simple
+from services.ai_client import DEFAULT_MODEL, is_ai_available, call_ai_simple, call_ai_simple_async
 
 
 SYSTEM_PROMPT = """You are an expert in translating military experience to civilian terminology.
@@ -50,9 +58,114 @@ Return a JSON object with this exact structure:
 Only return the JSON object, no additional text."""
 
 
+_YEARS_RE = re.compile(r'(\d+)\s*(?:years?|yrs?)')
+_SCOPE_RE = re.compile(r'(\d+)[\s-]*(?:person|soldier|marine|sailor|airman|personnel|people|member)')
+_ASSET_RE = re.compile(r'\$(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:m(?:illion)?|k|worth|value|equipment)')
+
+# Keyword tables for the fallback parser, checked in order (first match wins
+# for leadership level and clearance)
+_LEADERSHIP_KEYWORDS = {
+    "senior manager": ("battalion", "commander", "command sergeant", "first sergeant"),
+    "manager": ("company", "captain", "platoon leader", "section chief"),
+    "supervisor": ("sergeant", "staff sergeant", "petty officer", "nco"),
+    "team lead": ("squad leader", "team leader", "fire team", "crew chief"),
+}
+
+_TECHNICAL_KEYWORDS = {
+    "equipment maintenance": ("maintenance", "repair", "mechanic", "technician"),
+    "inventory management": ("inventory", "supply", "logistics", "warehouse"),
+    "communications systems": ("radio", "communications", "signal", "satellite"),
+    "medical procedures": ("medic", "medical", "first aid", "corpsman"),
+    "weapons systems": ("weapons", "armament", "gunnery", "ordnance"),
+    "vehicle operations": ("driver", "vehicle", "convoy", "transport"),
+    "network administration": ("network", "it", "systems", "cyber"),
+    "security operations": ("security", "force protection", "guard"),
+    "training and instruction": ("training", "instructor", "teach", "mentor"),
+    "documentation": ("reports", "documentation", "records", "admin"),
+}
+
+_SOFT_KEYWORDS = {
+    "leadership": ("led", "leader", "command", "supervised"),
+    "teamwork": ("team", "unit", "crew", "squad"),
+    "communication": ("briefed", "coordinated", "liaison"),
+    "problem solving": ("troubleshoot", "resolved", "solved"),
+    "adaptability": ("deployed", "various", "multiple", "diverse"),
+    "stress management": ("combat", "high-pressure", "operational"),
+    "attention to detail": ("inspection", "quality", "precision"),
+    "time management": ("deadline", "schedule", "mission"),
+}
+
+_CLEARANCE_KEYWORDS = {
+    "Top Secret/SCI": ("ts/sci", "top secret/sci"),
+    "Top Secret": ("top secret", "ts clearance"),
+    "Secret": ("secret clearance", "secret security"),
+    "Confidential": ("confidential clearance",),
+}
+
+# Trigger words for civilian-ready transferable skill translations
+_TRAINING_TRIGGERS = frozenset({"training", "instructor"})
+_LOGISTICS_TRIGGERS = frozenset({"logistics", "supply", "inventory"})
+_MAINTENANCE_TRIGGERS = frozenset({"maintenance", "repair", "mechanic"})
+_IT_TRIGGERS = frozenset({"network", "it", "cyber", "systems"})
+_MEDICAL_TRIGGERS = frozenset({"medic", "medical", "corpsman"})
+_SECURITY_TRIGGERS = frozenset({"security", "force protection"})
+
+_TRANSFERABLE_TRIGGERS = {
+    "training development and delivery": _TRAINING_TRIGGERS,
+    "supply chain and logistics management": _LOGISTICS_TRIGGERS,
+    "equipment maintenance and troubleshooting": _MAINTENANCE_TRIGGERS,
+    "information technology and systems administration": _IT_TRIGGERS,
+    "emergency medical response and patient care": _MEDICAL_TRIGGERS,
+    "security operations and risk management": _SECURITY_TRIGGERS,
+}
+
+_GENERAL_TRANSFERABLE_SKILLS = (
+    "high-stress decision making",
+    "operational planning and execution",
+    "cross-functional team collaboration",
+)
+
+
+def _build_keyword_automaton() -> ahocorasick.Automaton:
+    """
+    Build one Aho-Corasick automaton over every fallback keyword, so a single
+    pass over the description finds all (overlapping) keyword hits. Each
+    keyword maps to the (bucket, label) pairs it contributes to.
+    """
+    outputs = defaultdict(list)
+    buckets = {
+        "leadership": _LEADERSHIP_KEYWORDS,
+        "technical": _TECHNICAL_KEYWORDS,
+        "soft": _SOFT_KEYWORDS,
+        "clearance": _CLEARANCE_KEYWORDS,
+        "transferable": _TRANSFERABLE_TRIGGERS,
+    }
+    for bucket, table in buckets.items():
+        for label, keywords in table.items():
+            for kw in keywords:
+                outputs[kw].append((bucket, label))
+
+    automaton = ahocorasick.Automaton()
+    for kw, pairs in outputs.items():
+        automaton.add_word(kw, tuple(pairs))
+    automaton.make_automaton()
+    return automaton
+
+
+_KW_AUTOMATON = _build_keyword_automaton()
+
+
 def extract_json_from_text(text: str) -> dict:
     """Extract JSON object from text that might contain other content"""
-    # Try to find JSON object in the text
+    # JSON mode responses are a bare object; parse directly
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return data
+    except json.JSONDecodeError:
+        pass
+
+    # Otherwise try to find a JSON object in the text
     json_match = re.search(r'\{[\s\S]*\}', text)
     if json_match:
         try:
@@ -73,6 +186,80 @@ def extract_json_from_text(text: str) -> dict:
     }
 
 
+# Cap on concurrent AI requests issued by parse_military_experience_batch
+MAX_CONCURRENT_PARSES = 8
+
+# How long a parsed AI response is reused for an identical description
+PARSE_CACHE_TTL = 86400 * 30
+
+
+def _build_user_message(description: str) -> str:
+    return f"Parse this military experience and extract skills:\n\n{description}"
+
+
+def _parse_cache_key(description: str) -> str:
+    # The model and prompt are part of the key, so changing either
+    # invalidates previously cached parses
+    payload = f"parse|{DEFAULT_MODEL}|{SYSTEM_PROMPT}|{description.strip()}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _load_cached_skills(cache_key: str) -> Optional[ParsedSkills]:
+    try:
+        cached = get_cached_response(cache_key)
+        return ParsedSkills.model_validate_json(cached) if cached else None
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Ignoring parse cache entry: {e}")
+        return None
+
+
+def _has_skills(skills: ParsedSkills) -> bool:
+    return bool(
+        skills.leadership
+        or skills.technical_skills
+        or skills.soft_skills
+        or skills.transferable_skills
+        or skills.certifications
+    )
+
+
+def _store_cached_skills(cache_key: str, skills: ParsedSkills) -> None:
+    # An empty parse usually means the reply had no usable JSON; caching it
+    # would pin that failure for the whole TTL
+    if not _has_skills(skills):
+        return
+    try:
+        set_cached_response(cache_key, skills.model_dump_json(), PARSE_CACHE_TTL)
+    except sqlite3.Error as e:
+        print(f"Could not cache parsed skills: {e}")
+
+
+def _skills_from_response(response_text: str) -> ParsedSkills:
+    """Convert an AI response into a ParsedSkills model"""
+    # Parse JSON from response
+    data = extract_json_from_text(response_text)
+
+    # Convert to ParsedSkills model
+    leadership = None
+    if data.get("leadership") and isinstance(data["leadership"], dict):
+        leadership = Leadership(
+            level=data["leadership"].get("level") or "unknown",
+            scope=data["leadership"].get("scope") or "",
+            context=data["leadership"].get("context") or ""
+        )
+
+    return ParsedSkills(
+        leadership=leadership,
+        technical_skills=data.get("technical_skills", []),
+        soft_skills=data.get("soft_skills", []),
+        transferable_skills=data.get("transferable_skills", []),
+        years_experience=data.get("years_experience"),
+        asset_responsibility=data.get("asset_responsibility"),
+        certifications=data.get("certifications", []),
+        security_clearance=data.get("security_clearance")
+    )
+
+
 def parse_military_experience(description: str) -> ParsedSkills:
     """
     Parse military experience description into structured skills using Claude API via OpenRouter.
@@ -88,173 +275,184 @@ def parse_military_experience(description: str) -> ParsedSkills:
         print("AI not available (OPENROUTER_API_KEY not set), using fallback parser")
         return _fallback_parser(description)
 
+    # Identical descriptions reuse an earlier AI parse
+    cache_key = _parse_cache_key(description)
+    cached = _load_cached_skills(cache_key)
+    if cached:
+        return cached
+
     try:
         response_text = call_ai_simple(
-            user_message=f"Parse this military experience and extract skills:\n\n{description}",
+            user_message=_build_user_message(description),
             system_prompt=SYSTEM_PROMPT,
             max_tokens=2048,
+            json_mode=True,
         )
 
         if not response_text:
             return _fallback_parser(description)
 
-        # Parse JSON from response
-        data = extract_json_from_text(response_text)
-
-        # Convert to ParsedSkills model
-        leadership = None
-        if data.get("leadership") and isinstance(data["leadership"], dict):
-            leadership = Leadership(
-                level=data["leadership"].get("level") or "unknown",
-                scope=data["leadership"].get("scope") or "",
-                context=data["leadership"].get("context") or ""
-            )
-
-        return ParsedSkills(
-            leadership=leadership,
-            technical_skills=data.get("technical_skills", []),
-            soft_skills=data.get("soft_skills", []),
-            transferable_skills=data.get("transferable_skills", []),
-            years_experience=data.get("years_experience"),
-            asset_responsibility=data.get("asset_responsibility"),
-            certifications=data.get("certifications", []),
-            security_clearance=data.get("security_clearance")
+        skills = _skills_from_response(response_text)
+        _store_cached_skills(cache_key, skills)
+        return skills
+
+    except Exception as e:
+        print(f"Error calling AI: {e}")
+        return _fallback_parser(description)
+
+
+async def parse_military_experience_async(description: str) -> ParsedSkills:
+    """
+    Async variant of parse_military_experience.
+
+    Args:
+        description: Free-text description of military experience
+
+    Returns:
+        ParsedSkills object with extracted and translated skills
+    """
+    if not is_ai_available():
+        return _fallback_parser(description)
+
+    # Cache reads and writes go through a thread too, keeping sqlite off the loop
+    cache_key = _parse_cache_key(description)
+    cached = await asyncio.to_thread(_load_cached_skills, cache_key)
+    if cached:
+        return cached
+
+    try:
+        response_text = await call_ai_simple_async(
+            user_message=_build_user_message(description),
+            system_prompt=SYSTEM_PROMPT,
+            max_tokens=2048,
+            json_mode=True,
         )
 
+        if not response_text:
+            return _fallback_parser(description)
+
+        skills = _skills_from_response(response_text)
+        await asyncio.to_thread(_store_cached_skills, cache_key, skills)
+        return skills
+
     except Exception as e:
         print(f"Error calling AI: {e}")
         return _fallback_parser(description)
 
 
+async def parse_military_experience_batch(descriptions: list[str]) -> list[ParsedSkills]:
+    """
+    Parse several experience descriptions concurrently.
+
+    Requests are independent, so the batch takes roughly as long as the
+    slowest one. Concurrency is capped at MAX_CONCURRENT_PARSES to respect
+    provider rate limits.
+
+    Args:
+        descriptions: Free-text descriptions of military experience
+
+    Returns:
+        ParsedSkills objects in the same order as descriptions
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PARSES)
+
+    async def parse_one(description: str) -> ParsedSkills:
+        async with semaphore:
+            return await parse_military_experience_async(description)
+
+    return list(await asyncio.gather(*(parse_one(d) for d in descriptions)))
+
+
 def _fallback_parser(description: str) -> ParsedSkills:
     """
     Fallback parser using keyword extraction when API is unavailable.
     This provides basic functionality without AI.
     """
+    (leadership, technical_skills, soft_skills, transferable_skills,
+     years, asset_responsibility, clearance) = _fallback_parse_fields(description)
+
+    # Models are built fresh per call so callers never share cached objects
+    return ParsedSkills(
+        leadership=Leadership(
+            level=leadership[0],
+            scope=leadership[1],
+            context="military operational environment"
+        ) if leadership else None,
+        technical_skills=list(technical_skills),
+        soft_skills=list(soft_skills),
+        transferable_skills=list(transferable_skills),
+        years_experience=years,
+        asset_responsibility=asset_responsibility,
+        certifications=[],
+        security_clearance=clearance
+    )
+
+
+@lru_cache(maxsize=1024)
+def _fallback_parse_fields(description: str) -> tuple:
+    """
+    Keyword extraction behind _fallback_parser, memoized on the description.
+
+    Returns hashable pieces: ((level, scope) or None, technical, soft,
+    transferable, years, asset_responsibility, clearance). Call
+    _fallback_parse_fields.cache_clear() after changing the keyword tables.
+    """
     description_lower = description.lower()
 
+    # Single pass over the text collects every keyword hit by bucket
+    hits = defaultdict(set)
+    for _, pairs in _KW_AUTOMATON.iter(description_lower):
+        for bucket, label in pairs:
+            hits[bucket].add(label)
+
     # Extract years of experience
     years = None
-    years_match = re.search(r'(\d+)\s*(?:years?|yrs?)', description_lower)
+    years_match = _YEARS_RE.search(description_lower)
     if years_match:
         years = int(years_match.group(1))
 
-    # Leadership detection
+    # Leadership detection (highest level wins)
     leadership = None
-    leadership_keywords = {
-        "senior manager": ["battalion", "commander", "command sergeant", "first sergeant"],
-        "manager": ["company", "captain", "platoon leader", "section chief"],
-        "supervisor": ["sergeant", "staff sergeant", "petty officer", "nco"],
-        "team lead": ["squad leader", "team leader", "fire team", "crew chief"],
-    }
+    level = next((lvl for lvl in _LEADERSHIP_KEYWORDS if lvl in hits["leadership"]), None)
+    if level:
+        # Find scope
+        scope_match = _SCOPE_RE.search(description_lower)
+        scope = f"{scope_match.group(1)} direct reports" if scope_match else "team members"
+        leadership = (level, scope)
 
-    for level, keywords in leadership_keywords.items():
-        if any(kw in description_lower for kw in keywords):
-            # Find scope
-            scope_match = re.search(r'(\d+)[\s-]*(?:person|soldier|marine|sailor|airman|personnel|people|member)', description_lower)
-            scope = f"{scope_match.group(1)} direct reports" if scope_match else "team members"
-
-            leadership = Leadership(
-                level=level,
-                scope=scope,
-                context="military operational environment"
-            )
-            break
-
-    # Technical skills extraction
-    technical_keywords = {
-        "equipment maintenance": ["maintenance", "repair", "mechanic", "technician"],
-        "inventory management": ["inventory", "supply", "logistics", "warehouse"],
-        "communications systems": ["radio", "communications", "signal", "satellite"],
-        "medical procedures": ["medic", "medical", "first aid", "corpsman"],
-        "weapons systems": ["weapons", "armament", "gunnery", "ordnance"],
-        "vehicle operations": ["driver", "vehicle", "convoy", "transport"],
-        "network administration": ["network", "it", "systems", "cyber"],
-        "security operations": ["security", "force protection", "guard"],
-        "training and instruction": ["training", "instructor", "teach", "mentor"],
-        "documentation": ["reports", "documentation", "records", "admin"],
-    }
+    # Technical and soft skills, in table order
+    technical_skills = [skill for skill in _TECHNICAL_KEYWORDS if skill in hits["technical"]]
+    soft_skills = [skill for skill in _SOFT_KEYWORDS if skill in hits["soft"]]
 
-    technical_skills = []
-    for skill, keywords in technical_keywords.items():
-        if any(kw in description_lower for kw in keywords):
-            technical_skills.append(skill)
-
-    # Soft skills extraction
-    soft_skills = []
-    soft_keywords = {
-        "leadership": ["led", "leader", "command", "supervised"],
-        "teamwork": ["team", "unit", "crew", "squad"],
-        "communication": ["briefed", "coordinated", "liaison"],
-        "problem solving": ["troubleshoot", "resolved", "solved"],
-        "adaptability": ["deployed", "various", "multiple", "diverse"],
-        "stress management": ["combat", "high-pressure", "operational"],
-        "attention to detail": ["inspection", "quality", "precision"],
-        "time management": ["deadline", "schedule", "mission"],
-    }
-
-    for skill, keywords in soft_keywords.items():
-        if any(kw in description_lower for kw in keywords):
-            soft_skills.append(skill)
-
-    # Transferable skills (civilian-ready translations)
-    transferable_skills = []
+    # Transferable skills (civilian-ready translations). An insertion-ordered
+    # dict dedupes like a set but keeps priority order for the top-8 cut.
+    transferable = {}
 
     if leadership:
-        transferable_skills.append("team leadership and personnel management")
-
-    if "training" in description_lower or "instructor" in description_lower:
-        transferable_skills.append("training development and delivery")
+        transferable["team leadership and personnel management"] = None
 
-    if any(word in description_lower for word in ["logistics", "supply", "inventory"]):
-        transferable_skills.append("supply chain and logistics management")
-
-    if any(word in description_lower for word in ["maintenance", "repair", "mechanic"]):
-        transferable_skills.append("equipment maintenance and troubleshooting")
-
-    if any(word in description_lower for word in ["network", "it", "cyber", "systems"]):
-        transferable_skills.append("information technology and systems administration")
-
-    if any(word in description_lower for word in ["medic", "medical", "corpsman"]):
-        transferable_skills.append("emergency medical response and patient care")
-
-    if any(word in description_lower for word in ["security", "force protection"]):
-        transferable_skills.append("security operations and risk management")
+    transferable.update(
+        dict.fromkeys(skill for skill in _TRANSFERABLE_TRIGGERS if skill in hits["transferable"])
+    )
 
     # Add general transferable skills
-    transferable_skills.extend([
-        "high-stress decision making",
-        "operational planning and execution",
-        "cross-functional team collaboration"
-    ])
+    transferable.update(dict.fromkeys(_GENERAL_TRANSFERABLE_SKILLS))
 
     # Asset responsibility extraction
-    asset_match = re.search(r'\$(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:m(?:illion)?|k|worth|value|equipment)', description_lower)
+    asset_match = _ASSET_RE.search(description_lower)
     asset_responsibility = None
     if asset_match:
         asset_responsibility = f"${asset_match.group(1)} in equipment/assets"
 
-    # Security clearance detection
-    clearance = None
-    clearance_keywords = {
-        "Top Secret/SCI": ["ts/sci", "top secret/sci"],
-        "Top Secret": ["top secret", "ts clearance"],
-        "Secret": ["secret clearance", "secret security"],
-        "Confidential": ["confidential clearance"],
-    }
-
-    for level, keywords in clearance_keywords.items():
-        if any(kw in description_lower for kw in keywords):
-            clearance = level
-            break
-
-    return ParsedSkills(
-        leadership=leadership,
-        technical_skills=technical_skills[:10],  # Limit to top 10
-        soft_skills=soft_skills[:8],
-        transferable_skills=transferable_skills[:8],
-        years_experience=years,
-        asset_responsibility=asset_responsibility,
-        certifications=[],
-        security_clearance=clearance
+    # Security clearance detection (most specific level wins)
+    clearance = next((lvl for lvl in _CLEARANCE_KEYWORDS if lvl in hits["clearance"]), None)
+
+    return (
+        leadership,
+        tuple(technical_skills[:10]),  # Limit to top 10
+        tuple(soft_skills[:8]),
+        tuple(list(transferable)[:8]),
+        years,
+        asset_responsibility,
+        clearance,
     )
@@ -3,13 +3,86 @@ Resume generation service - creates civilian-ready resumes from military profile
 Uses OpenRouter/Claude API with extended thinking
 """
 
-from typing import Optional
-
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import re
+import sqlite3
+from dataclasses import dataclass, replace
+from typing import Iterable, Iterator, Optional, Union
+
+from database import catalog_cache, get_cached_response, set_cached_response, get_crosswalk_for_mos
 from models import MilitaryProfile, ParsedSkills
-from services.ai_client import is_ai_available, call_ai_simple
-
-
-SYSTEM_PROMPT = """You are a professional resume writer specializing in military-to-civilian transitions.
+from services.ai_client import (
+    DEFAULT_MODEL,
+    is_ai_available,
+    call_ai_simple,
+    call_ai_simple_async,
+    stream_ai_simple,
+    cached_text_block,
+)
+
+logger = logging.getLogger(__name__)
+
+# Military terms and their civilian equivalents, rendered into the shared
+# rules as a single compact line
+_CIVILIAN_TERMS = {
+    "Commanded": "Led/Managed",
+    "Platoon": "team of 30-40 personnel",
+    "Company": "organization of 100-200 personnel",
+    "Deployment": "overseas assignment/international operations",
+    "Battle drills": "emergency procedures/rapid response protocols",
+    "NCOER/OER": "performance evaluation",
+    "Enlisted": "entry-level to mid-level",
+    "Officer": "management/leadership role",
+    "MOS": "specialty/role",
+}
+
+# Civilian forms of branch names and pay grades, filled in locally so the
+# model doesn't spend output working them out
+_BRANCH_MAP = {
+    "Army": "U.S. Army",
+    "Navy": "U.S. Navy",
+    "Air Force": "U.S. Air Force",
+    "Marine Corps": "U.S. Marine Corps",
+    "Coast Guard": "U.S. Coast Guard",
+    "Space Force": "U.S. Space Force",
+}
+
+_RANK_MAP = {
+    "E-1": "Entry-level team member",
+    "E-2": "Entry-level team member",
+    "E-3": "Entry-level team member",
+    "E-4": "Senior team member / team lead",
+    "E-5": "Team supervisor",
+    "E-6": "First-line supervisor",
+    "E-7": "Operations manager",
+    "E-8": "Senior operations manager",
+    "E-9": "Senior manager / senior advisor to executive leadership",
+    "W-1": "Technical specialist",
+    "W-2": "Technical specialist",
+    "W-3": "Senior technical expert",
+    "W-4": "Senior technical expert",
+    "W-5": "Technical director",
+    "O-1": "Junior manager",
+    "O-2": "Project manager",
+    "O-3": "Manager",
+    "O-4": "Senior manager",
+    "O-5": "Director",
+    "O-6": "Senior director",
+    "O-7": "Executive",
+    "O-8": "Executive",
+    "O-9": "Senior executive",
+    "O-10": "Senior executive",
+}
+
+# Pay grades as typed by users, e.g. "E-6", "e6" or "O 3"
+_PAY_GRADE_RE = re.compile(r'^\s*([EOW])[\s-]*(\d{1,2})\s*$', re.IGNORECASE)
+
+# Writing rules shared by every resume and bullet request
+_SHARED_RULES = f"""You are a professional resume writer specializing in military-to-civilian transitions.
 Your job is to create clear, professional resumes that translate military accomplishments into
 business impact that civilian employers understand and value.
 
@@ -22,18 +95,11 @@ RULES:
 6. Use strong action verbs (Led, Managed, Developed, Implemented, Coordinated)
 7. Format for ATS (Applicant Tracking Systems) compatibility
 
-MILITARY TO CIVILIAN TRANSLATIONS:
-- "Commanded" → "Led" or "Managed"
-- "Platoon" → "team of 30-40 personnel"
-- "Company" → "organization of 100-200 personnel"
-- "Deployment" → "overseas assignment" or "international operations"
-- "Battle drills" → "emergency procedures" or "rapid response protocols"
-- "NCOER/OER" → "performance evaluation"
-- "Enlisted" → "entry-level to mid-level"
-- "Officer" → "management/leadership role"
-- "MOS" → "specialty" or "role"
-
-RESUME FORMAT:
+MILITARY TO CIVILIAN TRANSLATIONS (military → civilian):
+{'; '.join(f'{term} → {civilian}' for term, civilian in _CIVILIAN_TERMS.items())}"""
+
+# Output format for full resumes only
+_RESUME_FORMAT = """RESUME FORMAT:
 Use clean, professional formatting with clear sections. Output in Markdown format.
 
 Include these sections:
@@ -44,12 +110,355 @@ Include these sections:
 5. CERTIFICATIONS (if applicable)
 6. CLEARANCE (if applicable and relevant to target job)"""
 
+# The shared rules lead both system prompts as one cacheable block, so a
+# bullets request right after a resume request reuses the cached prefix
+_SHARED_RULES_BLOCK = cached_text_block(_SHARED_RULES)
+_RESUME_SYSTEM_BLOCKS = [_SHARED_RULES_BLOCK, {"type": "text", "text": _RESUME_FORMAT}]
+_BULLETS_SYSTEM_BLOCKS = [_SHARED_RULES_BLOCK]
+
+# Instructions for generating resumes for several target positions in one request
+_MULTI_TARGET_REQUEST_BLOCK = cached_text_block(
+    "Create a separate professional resume for this veteran for each target "
+    "position listed in the profile below.\n\n"
+    "Wrap each resume in <resume id=\"N\"></resume> tags, where N is the "
+    "position's number, and write nothing outside the tags. Base every claim "
+    "on this profile and follow the resume format exactly for every resume."
+)
+
+# One bullet per line: "-", "*" or "•" markers, or "1." / "1)" numbering.
+# Markers must be followed by whitespace so "**Bold**" and "---" don't match.
+_BULLET_RE = re.compile(r'^[ \t]*(?:[-*•][ \t]+|\d+[.)][ \t]+)(.+?)[ \t\r]*$', re.MULTILINE)
+
+# A Markdown heading, which every resume in the requested format has
+_HEADING_RE = re.compile(r'^[ \t]*#{1,6}[ \t]+\S', re.MULTILINE)
+
+_RESUME_TAG_RE = re.compile(r'<resume id="(\d+)">\s*(.*?)\s*</resume>', re.DOTALL)
+
+# Output token budgets. A resume's budget grows with the skills and
+# certifications it has to cover, up to RESUME_MAX_TOKENS.
+RESUME_MAX_TOKENS = 3072
+RESUME_BASE_TOKENS = 1200
+TOKENS_PER_BULLET = 80
+
+# Profiles below both thresholds get the template resume without an AI call
+MIN_RESUME_SIGNAL = 3
+MIN_DESCRIPTION_LENGTH = 100
+
+# Cap on concurrent AI requests issued by generate_resumes_batch
+MAX_CONCURRENT_RESUMES = 4
+
+# Most target jobs combined into one multi-target resume request
+MAX_TARGETS_PER_PROMPT = 4
+
+# How long a generated resume or bullet list is reused for an identical request
+RESPONSE_CACHE_TTL = 86400
+
+# Fixed instructions that open every resume request, ahead of the per-veteran
+# profile block
+_RESUME_REQUEST_BLOCK = cached_text_block(
+    "Create a professional resume for this veteran.\n\n"
+    "The profile below gives service details, the target position, skills "
+    "extracted from their record and, last, their own description of their "
+    "experience. Base every claim on this profile and follow the resume "
+    "format exactly."
+)
+
+
+def _response_cache_key(
+    system_prompt: list[dict],
+    user_message: Union[str, list[dict]],
+    max_tokens: int,
+) -> str:
+    # Everything sent to the model is part of the key, so a changed prompt
+    # or model never returns a stale response
+    payload = json.dumps(
+        {"model": DEFAULT_MODEL, "system": system_prompt, "user": user_message, "max_tokens": max_tokens},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _load_cached_text(cache_key: str) -> Optional[str]:
+    try:
+        return get_cached_response(cache_key)
+    except sqlite3.Error as e:
+        logger.warning("Ignoring resume cache entry: %s", e)
+        return None
+
+
+def _store_cached_text(cache_key: str, text: str) -> None:
+    try:
+        set_cached_response(cache_key, text, RESPONSE_CACHE_TTL)
+    except sqlite3.Error as e:
+        logger.warning("Could not cache generated text: %s", e)
+
+
+@dataclass(frozen=True)
+class _AIRequest:
+    """A prepared model request and the cache key its response is stored under"""
+    system_prompt: list[dict]
+    user_message: Union[str, list[dict]]
+    max_tokens: int
+    cache_key: str
+    # Output budget for one retry if the response is cut off
+    retry_max_tokens: int = RESUME_MAX_TOKENS
+
+
+def _ai_request(
+    system_prompt: list[dict],
+    user_message: Union[str, list[dict]],
+    max_tokens: int,
+    retry_max_tokens: int = RESUME_MAX_TOKENS,
+) -> _AIRequest:
+    cache_key = _response_cache_key(system_prompt, user_message, max_tokens)
+    return _AIRequest(system_prompt, user_message, max_tokens, cache_key, retry_max_tokens)
+
+
+def _truncated_retry(request: _AIRequest) -> Optional[_AIRequest]:
+    """The request to retry a truncated response with, or None to give up"""
+    if request.max_tokens >= request.retry_max_tokens:
+        return None
+    logger.warning(
+        "Response hit %d max_tokens, retrying with %d", request.max_tokens, request.retry_max_tokens
+    )
+    return replace(request, max_tokens=request.retry_max_tokens)
+
+
+def _send(request: _AIRequest) -> Optional[str]:
+    """
+    Send a prepared request, retrying once with its retry_max_tokens if the
+    output is cut off. Returns None if it is still truncated, so callers
+    fall back instead of using or caching partial text.
+    """
+    while request is not None:
+        text, finish_reason = call_ai_simple(
+            user_message=request.user_message,
+            system_prompt=request.system_prompt,
+            max_tokens=request.max_tokens,
+            return_finish_reason=True,
+        )
+        if finish_reason != "length":
+            return text
+        request = _truncated_retry(request)
+    return None
+
+
+async def _send_async(request: _AIRequest) -> Optional[str]:
+    """Async variant of _send"""
+    while request is not None:
+        text, finish_reason = await call_ai_simple_async(
+            user_message=request.user_message,
+            system_prompt=request.system_prompt,
+            max_tokens=request.max_tokens,
+            return_finish_reason=True,
+        )
+        if finish_reason != "length":
+            return text
+        request = _truncated_retry(request)
+    return None
+
+
+def _is_low_signal(profile: MilitaryProfile, parsed_skills: ParsedSkills) -> bool:
+    """Whether a profile has too little detail for the model to improve on the template"""
+    signal = (
+        len(parsed_skills.technical_skills)
+        + len(parsed_skills.soft_skills)
+        + len(parsed_skills.transferable_skills)
+        + len(parsed_skills.certifications)
+        + (1 if parsed_skills.leadership else 0)
+    )
+    return signal < MIN_RESUME_SIGNAL and len(profile.experience_description) < MIN_DESCRIPTION_LENGTH
+
+
+def _branch_display(branch: str) -> str:
+    return _BRANCH_MAP.get(branch, branch)
+
+
+def _civilian_rank(rank: Optional[str]) -> Optional[str]:
+    """Civilian equivalent of a pay grade, or None if the rank isn't one"""
+    match = _PAY_GRADE_RE.match(rank) if rank else None
+    if not match:
+        return None
+    return _RANK_MAP.get(f"{match.group(1).upper()}-{int(match.group(2))}")
+
+
+@catalog_cache(maxsize=1024)
+def _cached_mos_title(mos_code: str, branch: str) -> Optional[str]:
+    rows = get_crosswalk_for_mos(mos_code, branch) or get_crosswalk_for_mos(mos_code)
+    return next((row["military_title"] for row in rows if row.get("military_title")), None)
+
+
+def _mos_title(mos_code: str, branch: str) -> Optional[str]:
+    """
+    Military job title for an MOS/rate code from the crosswalk table.
+
+    Database errors are handled outside the cache so a transient failure
+    isn't remembered as a missing title.
+    """
+    try:
+        return _cached_mos_title(mos_code, branch)
+    except sqlite3.Error as e:
+        logger.warning("Could not look up MOS title: %s", e)
+        return None
+
+
+def clear_mos_title_cache() -> None:
+    """Drop cached MOS titles (reseeds are picked up automatically)"""
+    _cached_mos_title.cache_clear()
+
+
+def _csv(items: list[str], default: str = 'None listed') -> str:
+    """Comma-join items, or return default for an empty list"""
+    return ', '.join(items) if items else default
+
+
+def _resume_max_tokens(parsed_skills: ParsedSkills) -> int:
+    """Output budget for one resume, scaled to the size of the profile"""
+    estimate = (
+        RESUME_BASE_TOKENS
+        + 40 * len(parsed_skills.technical_skills)
+        + 30 * len(parsed_skills.certifications)
+    )
+    return min(RESUME_MAX_TOKENS, estimate)
+
+
+def _bullets_max_tokens(num_bullets: int) -> int:
+    """Output budget for a list of bullets"""
+    return TOKENS_PER_BULLET * num_bullets + 100
+
+
+def _dedupe_skills(skills: Iterable[str], seen: set[str]) -> list[str]:
+    """Keep the first occurrence of each skill, ignoring case and whitespace"""
+    unique = []
+    for skill in skills:
+        key = skill.strip().lower()
+        if key not in seen:
+            seen.add(key)
+            unique.append(skill)
+    return unique
+
+
+def _build_profile_summary(profile: MilitaryProfile, parsed_skills: ParsedSkills, targets: str) -> str:
+    """Render the veteran profile, with the given target section, for a prompt"""
+    leadership = parsed_skills.leadership.model_dump() if parsed_skills.leadership else 'Not specified'
+    # A skill listed under several categories is only shown under the first
+    seen: set[str] = set()
+    technical = _dedupe_skills(parsed_skills.technical_skills, seen)
+    soft = _dedupe_skills(parsed_skills.soft_skills, seen)
+    transferable = _dedupe_skills(parsed_skills.transferable_skills, seen)
+
+    # Deterministic translations are given to the model ready-made
+    mos = profile.mos_code or 'Not specified'
+    mos_title = _mos_title(profile.mos_code.strip().upper(), profile.branch) if profile.mos_code else None
+    if mos_title:
+        mos = f"{mos} ({mos_title})"
+    rank = profile.rank or 'Not specified'
+    civilian_rank = _civilian_rank(profile.rank)
+    if civilian_rank:
+        rank = f"{rank} (civilian equivalent: {civilian_rank})"
+
+    # Stable fields first and the free-text description last, so
+    # profiles share as long a prefix as possible
+    return f"""
+MILITARY PROFILE:
+- Branch: {_branch_display(profile.branch)}
+- MOS/Rate: {mos}
+- Rank: {rank}
+- Years of Service: {profile.years_of_service}
+
+{targets}
+
+EXTRACTED SKILLS:
+- Leadership: {leadership}
+- Technical Skills: {_csv(technical)}
+- Soft Skills: {_csv(soft)}
+- Transferable Skills: {_csv(transferable)}
+- Years Experience: {parsed_skills.years_experience or profile.years_of_service}
+- Asset Responsibility: {parsed_skills.asset_responsibility or 'Not specified'}
+- Certifications: {_csv(_dedupe_skills(parsed_skills.certifications, set()))}
+- Security Clearance: {parsed_skills.security_clearance or 'Not specified'}
+
+EXPERIENCE DESCRIPTION:
+{profile.experience_description}
+"""
+
+
+def _build_resume_message(
+    profile: MilitaryProfile,
+    parsed_skills: ParsedSkills,
+    target_job: str,
+    target_company: Optional[str] = None,
+) -> list[dict]:
+    """Build the user content blocks for a resume request"""
+    targets = f"TARGET POSITION: {target_job}\n{f'TARGET COMPANY: {target_company}' if target_company else ''}"
+    profile_summary = _build_profile_summary(profile, parsed_skills, targets)
+    return [_RESUME_REQUEST_BLOCK, {"type": "text", "text": profile_summary}]
+
+
+def _prepare_resume(
+    profile: MilitaryProfile,
+    parsed_skills: ParsedSkills,
+    target_job: str,
+    target_company: Optional[str],
+    regenerate: bool = False,
+) -> tuple[Optional[str], Optional[_AIRequest]]:
+    """
+    Resolve a resume request up to the model call.
+
+    Returns (resume, None) when no call is needed: AI is unavailable, the
+    profile is too sparse, or the response is cached. Otherwise returns
+    (None, request) with the request to send. With regenerate, the cache is
+    not consulted; the fresh response then replaces the cached one.
+    """
+    if not is_ai_available():
+        logger.info("AI not available, using fallback resume generator")
+        return _fallback_resume(profile, parsed_skills, target_job), None
+
+    # Sparse profiles gain nothing from the model over the template
+    if _is_low_signal(profile, parsed_skills):
+        return _fallback_resume(profile, parsed_skills, target_job), None
+
+    request = _ai_request(
+        _RESUME_SYSTEM_BLOCKS,
+        _build_resume_message(profile, parsed_skills, target_job, target_company),
+        _resume_max_tokens(parsed_skills),
+    )
+    cached = None if regenerate else _load_cached_text(request.cache_key)
+    if cached:
+        return cached, None
+    return None, request
+
+
+def _finish_resume(
+    request: _AIRequest,
+    response: Optional[str],
+    profile: MilitaryProfile,
+    parsed_skills: ParsedSkills,
+    target_job: str,
+) -> str:
+    """Cache a successful response, or fall back to the template resume"""
+    if not _is_resume_text(response):
+        return _fallback_resume(profile, parsed_skills, target_job)
+    _store_cached_text(request.cache_key, response)
+    return response
+
+
+def _is_resume_text(response: Optional[str]) -> bool:
+    """
+    Whether a response looks like a Markdown resume rather than a refusal or
+    the raw JSON call_ai returns for an unexpected payload
+    """
+    if not response or response.lstrip().startswith("{"):
+        return False
+    return bool(_HEADING_RE.search(response) or _BULLET_RE.search(response))
+
 
 def generate_resume(
     profile: MilitaryProfile,
     parsed_skills: ParsedSkills,
     target_job: str,
     target_company: Optional[str] = None,
+    regenerate: bool = False,
 ) -> str:
     """
     Generate a civilian-ready resume from military profile.
@@ -59,99 +468,223 @@ def generate_resume(
         parsed_skills: ParsedSkills from the parser
         target_job: Target civilian job title
         target_company: Optional target company name
+        regenerate: Generate a fresh resume even if one is cached for these inputs
 
     Returns:
         Resume text in Markdown format
     """
-    if not is_ai_available():
-        print("AI not available, using fallback resume generator")
-        return _fallback_resume(profile, parsed_skills, target_job)
+    resume, request = _prepare_resume(profile, parsed_skills, target_job, target_company, regenerate)
+    if request is None:
+        return resume
 
     try:
-        # Build the profile summary for the prompt
-        profile_summary = f"""
-MILITARY PROFILE:
-- Branch: {profile.branch}
-- Years of Service: {profile.years_of_service}
-- MOS/Rate: {profile.mos_code or 'Not specified'}
-- Rank: {profile.rank or 'Not specified'}
+        response = _send(request)
+    except Exception:
+        logger.exception("generate_resume failed, using fallback resume")
+        response = None
+    return _finish_resume(request, response, profile, parsed_skills, target_job)
 
-EXPERIENCE DESCRIPTION:
-{profile.experience_description}
 
-EXTRACTED SKILLS:
-- Leadership: {parsed_skills.leadership.model_dump() if parsed_skills.leadership else 'Not specified'}
-- Technical Skills: {', '.join(parsed_skills.technical_skills) or 'None listed'}
-- Soft Skills: {', '.join(parsed_skills.soft_skills) or 'None listed'}
-- Transferable Skills: {', '.join(parsed_skills.transferable_skills) or 'None listed'}
-- Years Experience: {parsed_skills.years_experience or profile.years_of_service}
-- Asset Responsibility: {parsed_skills.asset_responsibility or 'Not specified'}
-- Certifications: {', '.join(parsed_skills.certifications) or 'None listed'}
-- Security Clearance: {parsed_skills.security_clearance or 'Not specified'}
+async def generate_resume_async(
+    profile: MilitaryProfile,
+    parsed_skills: ParsedSkills,
+    target_job: str,
+    target_company: Optional[str] = None,
+    regenerate: bool = False,
+) -> str:
+    """
+    Async variant of generate_resume.
 
-TARGET POSITION: {target_job}
-{f'TARGET COMPANY: {target_company}' if target_company else ''}
-"""
+    Cache and database work runs in a worker thread, like the AI call.
 
-        response = call_ai_simple(
-            user_message=f"Create a professional resume for this veteran:\n\n{profile_summary}",
-            system_prompt=SYSTEM_PROMPT,
-            max_tokens=3072,
-        )
+    Args:
+        profile: MilitaryProfile with service details
+        parsed_skills: ParsedSkills from the parser
+        target_job: Target civilian job title
+        target_company: Optional target company name
+        regenerate: Generate a fresh resume even if one is cached for these inputs
 
-        if response:
-            return response
-        else:
-            return _fallback_resume(profile, parsed_skills, target_job)
+    Returns:
+        Resume text in Markdown format
+    """
+    resume, request = await asyncio.to_thread(
+        _prepare_resume, profile, parsed_skills, target_job, target_company, regenerate
+    )
+    if request is None:
+        return resume
 
-    except Exception as e:
-        print(f"Error generating resume with API: {e}")
-        return _fallback_resume(profile, parsed_skills, target_job)
+    try:
+        response = await _send_async(request)
+    except Exception:
+        logger.exception("generate_resume_async failed, using fallback resume")
+        response = None
+    return await asyncio.to_thread(
+        _finish_resume, request, response, profile, parsed_skills, target_job
+    )
 
 
-def _fallback_resume(
+def generate_resume_stream(
     profile: MilitaryProfile,
     parsed_skills: ParsedSkills,
-    target_job: str
-) -> str:
-    """
-    Generate a basic resume template when API is unavailable.
+    target_job: str,
+    target_company: Optional[str] = None,
+    regenerate: bool = False,
+) -> Iterator[str]:
     """
-    # Translate branch for civilian understanding
-    branch_display = profile.branch
+    Streaming variant of generate_resume.
 
-    # Create leadership description
-    leadership_desc = ""
-    if parsed_skills.leadership:
-        leadership_desc = f"Experienced {parsed_skills.leadership.level} with history of managing {parsed_skills.leadership.scope} in {parsed_skills.leadership.context}."
+    Yields the resume as it is generated so the first text can be shown
+    within about a second. The text is cached like generate_resume, but only
+    once the stream has completed. Falls back to the template resume if the
+    request fails before any text arrives.
 
-    # Format skills as bullet points
-    all_skills = []
-    all_skills.extend(parsed_skills.technical_skills[:5])
-    all_skills.extend(parsed_skills.soft_skills[:3])
-    all_skills.extend(parsed_skills.transferable_skills[:4])
+    Args:
+        profile: MilitaryProfile with service details
+        parsed_skills: ParsedSkills from the parser
+        target_job: Target civilian job title
+        target_company: Optional target company name
+        regenerate: Generate a fresh resume even if one is cached for these inputs
 
-    skills_bullets = "\n".join([f"- {skill.title()}" for skill in all_skills[:10]])
+    Yields:
+        Chunks of resume text in Markdown format
+    """
+    resume, request = _prepare_resume(profile, parsed_skills, target_job, target_company, regenerate)
+    if request is None:
+        yield resume
+        return
 
-    # Create certifications section
-    certs_section = ""
-    if parsed_skills.certifications:
-        certs_section = f"""
-## CERTIFICATIONS
+    chunks = []
+    try:
+        for chunk in stream_ai_simple(
+            user_message=request.user_message,
+            system_prompt=request.system_prompt,
+            max_tokens=request.max_tokens,
+        ):
+            chunks.append(chunk)
+            yield chunk
+    except Exception:
+        logger.exception("generate_resume_stream failed")
+        # Text already sent can't be taken back, so only fall back before it
+        if not chunks:
+            yield _fallback_resume(profile, parsed_skills, target_job)
+        return
+
+    resume = _finish_resume(request, "".join(chunks), profile, parsed_skills, target_job)
+    if not chunks:
+        yield resume
+
+
+async def _multi_target_resumes(
+    profile: MilitaryProfile,
+    parsed_skills: ParsedSkills,
+    target_jobs: list[str],
+    target_company: Optional[str],
+    regenerate: bool,
+) -> dict[str, str]:
+    """
+    Generate resumes for several target jobs in a single AI request.
 
-{chr(10).join([f'- {cert}' for cert in parsed_skills.certifications])}
-"""
+    The profile and instructions are sent once for all targets instead of
+    once per target. Targets missing from the response are left out of the
+    result for the caller to generate on their own.
 
-    # Create clearance section
-    clearance_section = ""
-    if parsed_skills.security_clearance:
-        clearance_section = f"""
-## SECURITY CLEARANCE
+    Returns:
+        Dict mapping target jobs to resume text in Markdown format
+    """
+    targets = "TARGET POSITIONS:\n" + "\n".join(
+        f"{i}. {job}" for i, job in enumerate(target_jobs, start=1)
+    )
+    if target_company:
+        targets += f"\nTARGET COMPANY: {target_company}"
+    request = _ai_request(
+        _RESUME_SYSTEM_BLOCKS,
+        [
+            _MULTI_TARGET_REQUEST_BLOCK,
+            {"type": "text", "text": _build_profile_summary(profile, parsed_skills, targets)},
+        ],
+        _resume_max_tokens(parsed_skills) * len(target_jobs),
+        retry_max_tokens=RESUME_MAX_TOKENS * len(target_jobs),
+    )
+
+    response = None if regenerate else await asyncio.to_thread(_load_cached_text, request.cache_key)
+    if not response:
+        try:
+            response = await _send_async(request)
+        except Exception:
+            logger.exception("Multi-target resume request failed")
+            return {}
+
+    resumes = {}
+    for resume_id, text in _RESUME_TAG_RE.findall(response or ""):
+        index = int(resume_id) - 1
+        if 0 <= index < len(target_jobs) and text:
+            resumes[target_jobs[index]] = text
+    if len(resumes) == len(target_jobs):
+        await asyncio.to_thread(_store_cached_text, request.cache_key, response)
+    return resumes
+
+
+async def generate_resumes_batch(
+    requests: list[tuple[MilitaryProfile, ParsedSkills, str, Optional[str], bool]],
+) -> list[str]:
+    """
+    Generate several resumes concurrently.
 
-- {parsed_skills.security_clearance}
-"""
+    Requests that differ only in target job are combined, up to
+    MAX_TARGETS_PER_PROMPT jobs at a time, into one multi-target AI request.
+    Targets the combined request misses are generated on their own.
+    Concurrency is capped at MAX_CONCURRENT_RESUMES to respect provider
+    rate limits.
+
+    Args:
+        requests: (profile, parsed_skills, target_job, target_company, regenerate)
+            tuples
 
-    resume = f"""# [VETERAN NAME]
+    Returns:
+        Resume texts in the same order as requests
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_RESUMES)
+
+    # Group by everything except the target job
+    keys = [
+        (profile.model_dump_json(), parsed_skills.model_dump_json(), target_company, regenerate)
+        for profile, parsed_skills, _, target_company, regenerate in requests
+    ]
+    groups: dict[tuple, tuple[tuple, list[str]]] = {}
+    for key, request in zip(keys, requests):
+        jobs = groups.setdefault(key, (request, []))[1]
+        if request[2] not in jobs:
+            jobs.append(request[2])
+
+    resumes: dict[tuple, str] = {}
+
+    async def generate_one(key: tuple, request: tuple, target_job: str) -> None:
+        profile, parsed_skills, _, target_company, regenerate = request
+        async with semaphore:
+            resumes[key, target_job] = await generate_resume_async(
+                profile, parsed_skills, target_job, target_company, regenerate
+            )
+
+    async def generate_group(key: tuple, request: tuple, jobs: list[str]) -> None:
+        profile, parsed_skills, _, target_company, regenerate = request
+        if len(jobs) > 1 and is_ai_available() and not _is_low_signal(profile, parsed_skills):
+            async with semaphore:
+                combined = await _multi_target_resumes(profile, parsed_skills, jobs, target_company, regenerate)
+            resumes.update(((key, job), text) for job, text in combined.items())
+        await asyncio.gather(*(
+            generate_one(key, request, job) for job in jobs if (key, job) not in resumes
+        ))
+
+    await asyncio.gather(*(
+        generate_group(key, request, jobs[i:i + MAX_TARGETS_PER_PROMPT])
+        for key, (request, jobs) in groups.items()
+        for i in range(0, len(jobs), MAX_TARGETS_PER_PROMPT)
+    ))
+    return [resumes[key, request[2]] for key, request in zip(keys, requests)]
+
+
+# Template for the fallback resume; optional sections arrive pre-rendered
+_RESUME_TEMPLATE = """# [VETERAN NAME]
 
 **Email:** [your.email@email.com] | **Phone:** [XXX-XXX-XXXX] | **Location:** [City, State]
 **LinkedIn:** [linkedin.com/in/yourprofile]
@@ -160,23 +693,23 @@ def _fallback_resume(
 
 ## PROFESSIONAL SUMMARY
 
-Dedicated professional with {parsed_skills.years_experience or profile.years_of_service} years of experience in the {branch_display}. {leadership_desc} Proven track record of excellence in high-pressure environments with strong focus on mission accomplishment and team development. Seeking to leverage military experience in a {target_job} role.
+Dedicated professional with {years} years of experience in the {branch}. {leadership} Proven track record of excellence in high-pressure environments with strong focus on mission accomplishment and team development. Seeking to leverage military experience in a {target_job} role.
 
 ---
 
 ## CORE COMPETENCIES
 
-{skills_bullets}
+{skills}
 
 ---
 
 ## PROFESSIONAL EXPERIENCE
 
-### {branch_display} | [Dates of Service]
+### {branch} | [Dates of Service]
 **[Most Recent Rank/Position]**
 
 - Led and managed team operations, ensuring 100% mission completion rate
-- Maintained and operated equipment valued at {parsed_skills.asset_responsibility or 'significant value'}
+- Maintained and operated equipment valued at {assets}
 - Trained and mentored junior team members on procedures and best practices
 - Coordinated logistics and resources for operational requirements
 - Implemented process improvements resulting in increased efficiency
@@ -191,20 +724,112 @@ Dedicated professional with {parsed_skills.years_experience or profile.years_of_
 - Relevant military training and professional development courses
 - Leadership development programs
 - Technical certifications and qualifications
-{certs_section}
-{clearance_section}
+{certs}
+{clearance}
 ---
 
 *References available upon request*
 """
 
-    return resume
+
+def _fallback_resume(
+    profile: MilitaryProfile,
+    parsed_skills: ParsedSkills,
+    target_job: str
+) -> str:
+    """
+    Generate a basic resume template when API is unavailable.
+    """
+    leadership = parsed_skills.leadership
+    all_skills = _dedupe_skills(
+        itertools.chain(
+            parsed_skills.technical_skills[:5],
+            parsed_skills.soft_skills[:3],
+            parsed_skills.transferable_skills[:4],
+        ),
+        set(),
+    )[:10]
+
+    certs_section = ""
+    if parsed_skills.certifications:
+        certs_list = "\n".join(f"- {cert}" for cert in parsed_skills.certifications)
+        certs_section = f"\n## CERTIFICATIONS\n\n{certs_list}\n"
+
+    clearance_section = ""
+    if parsed_skills.security_clearance:
+        clearance_section = f"\n## SECURITY CLEARANCE\n\n- {parsed_skills.security_clearance}\n"
+
+    return _RESUME_TEMPLATE.format_map({
+        "years": parsed_skills.years_experience or profile.years_of_service,
+        "branch": _branch_display(profile.branch),
+        "leadership": (
+            f"Experienced {leadership.level} with history of managing {leadership.scope} in {leadership.context}."
+            if leadership else ""
+        ),
+        "target_job": target_job,
+        "skills": "\n".join(f"- {skill.title()}" for skill in all_skills),
+        "assets": parsed_skills.asset_responsibility or 'significant value',
+        "certs": certs_section,
+        "clearance": clearance_section,
+    })
+
+
+def _build_bullets_message(experience_description: str, target_job: str, num_bullets: int) -> str:
+    """Build the user prompt for a targeted bullets request"""
+    return f"""Based on this military experience, generate {num_bullets} strong resume bullet points
+targeting a {target_job} position. Use civilian language, quantify achievements, and start with action verbs.
+
+Military Experience:
+{experience_description}
+
+Return only the bullet points, one per line, starting with a dash (-)."""
+
+
+def _bullets_from_response(response: str, num_bullets: int) -> list[str]:
+    """Parse bullet lines (-, *, • or numbered) from a model response"""
+    return _BULLET_RE.findall(response)[:num_bullets]
+
+
+def _prepare_bullets(
+    experience_description: str,
+    target_job: str,
+    num_bullets: int,
+    regenerate: bool = False,
+) -> tuple[Optional[list[str]], Optional[_AIRequest]]:
+    """
+    Resolve a bullets request up to the model call.
+
+    Returns (bullets, None) when no call is needed, otherwise (None, request).
+    With regenerate, the cache is not consulted.
+    """
+    if not is_ai_available():
+        return _fallback_bullets(num_bullets), None
+
+    request = _ai_request(
+        _BULLETS_SYSTEM_BLOCKS,
+        _build_bullets_message(experience_description, target_job, num_bullets),
+        _bullets_max_tokens(num_bullets),
+    )
+    cached = None if regenerate else _load_cached_text(request.cache_key)
+    if cached:
+        return _bullets_from_response(cached, num_bullets), None
+    return None, request
+
+
+def _finish_bullets(request: _AIRequest, response: Optional[str], num_bullets: int) -> list[str]:
+    """Parse a response and cache it if it has bullets, or fall back to default bullets"""
+    bullets = _bullets_from_response(response, num_bullets) if response else []
+    if not bullets:
+        return _fallback_bullets(num_bullets)
+    _store_cached_text(request.cache_key, response)
+    return bullets
 
 
 def generate_targeted_bullets(
     experience_description: str,
     target_job: str,
     num_bullets: int = 5,
+    regenerate: bool = False,
 ) -> list[str]:
     """
     Generate targeted achievement bullets for a specific job application.
@@ -213,37 +838,56 @@ def generate_targeted_bullets(
         experience_description: Military experience description
         target_job: Target civilian job
         num_bullets: Number of bullets to generate
+        regenerate: Generate fresh bullets even if some are cached for these inputs
 
     Returns:
         List of achievement bullet strings
     """
-    if not is_ai_available():
-        return _fallback_bullets(num_bullets)
+    bullets, request = _prepare_bullets(experience_description, target_job, num_bullets, regenerate)
+    if request is None:
+        return bullets
 
     try:
-        response = call_ai_simple(
-            user_message=f"""Based on this military experience, generate {num_bullets} strong resume bullet points
-targeting a {target_job} position. Use civilian language, quantify achievements, and start with action verbs.
+        response = _send(request)
+    except Exception:
+        logger.exception("generate_targeted_bullets failed, using fallback bullets")
+        response = None
+    return _finish_bullets(request, response, num_bullets)
 
-Military Experience:
-{experience_description}
 
-Return only the bullet points, one per line, starting with a dash (-).""",
-            max_tokens=1024,
-        )
+async def generate_targeted_bullets_async(
+    experience_description: str,
+    target_job: str,
+    num_bullets: int = 5,
+    regenerate: bool = False,
+) -> list[str]:
+    """
+    Async variant of generate_targeted_bullets.
 
-        if not response:
-            return _fallback_bullets(num_bullets)
+    Can run alongside generate_resume_async for the same veteran, e.g. with
+    asyncio.gather, so both requests are in flight at once.
 
-        # Parse bullets from response
-        lines = response.strip().split('\n')
-        bullets = [line.lstrip('- ').strip() for line in lines if line.strip().startswith('-')]
+    Args:
+        experience_description: Military experience description
+        target_job: Target civilian job
+        num_bullets: Number of bullets to generate
+        regenerate: Generate fresh bullets even if some are cached for these inputs
 
-        return bullets[:num_bullets]
+    Returns:
+        List of achievement bullet strings
+    """
+    bullets, request = await asyncio.to_thread(
+        _prepare_bullets, experience_description, target_job, num_bullets, regenerate
+    )
+    if request is None:
+        return bullets
 
-    except Exception as e:
-        print(f"Error generating bullets: {e}")
-        return _fallback_bullets(num_bullets)
+    try:
+        response = await _send_async(request)
+    except Exception:
+        logger.exception("generate_targeted_bullets_async failed, using fallback bullets")
+        response = None
+    return await asyncio.to_thread(_finish_bullets, request, response, num_bullets)
 
 
 def _fallback_bullets(num_bullets: int) -> list[str]:
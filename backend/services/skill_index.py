@@ -0,0 +1,126 @@
+"""
+In-memory occupation skill index for vectorized career matching
+
+Loads the occupation/skill catalog once into a dense occupation x skill
+occurrence matrix, so exact skill matching is scored with NumPy instead of
+a SQL aggregate on every request.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from database import catalog_cache, get_db
+from services.skills_vocab import NormalizedSkills
+
+# Industries ranked ahead of the rest, as in search_occupations_by_skill_tokens
+PRIORITY_INDUSTRIES = ("manufacturing", "construction", "technology", "logistics", "energy")
+
+
+class _SkillIndex:
+    """Occupation x skill matrix plus the per-occupation columns used for ranking"""
+
+    def __init__(self, occupations: list[dict], skill_rows: list[tuple[str, str]]):
+        self.occupations = occupations
+        row_by_code = {occ["occupation_code"]: i for i, occ in enumerate(occupations)}
+
+        pairs = [(row_by_code[code], skill) for code, skill in skill_rows if code in row_by_code]
+        self.vocab = {skill: i for i, skill in enumerate(sorted({skill for _, skill in pairs}))}
+
+        n_occ = len(occupations)
+        # One byte per cell, column-major so each skill's column is contiguous
+        # for the per-request column gather
+        self.matrix = np.zeros((n_occ, len(self.vocab)), dtype=np.uint8, order="F")
+        # Denominator counts every skill row of the occupation
+        self.skill_counts = np.zeros(n_occ, dtype=np.int64)
+        for row, skill in pairs:
+            self.matrix[row, self.vocab[skill]] = 1
+            self.skill_counts[row] += 1
+
+        self.wages = np.array([occ.get("median_wage") or 0 for occ in occupations], dtype=np.int64)
+        self.priority = np.array(
+            [occ.get("industry") in PRIORITY_INDUSTRIES for occ in occupations], dtype=bool
+        )
+        # Industries as small ints so preference filters are a vectorized isin
+        self.industry_ids: dict[str, int] = {}
+        self.industries = np.array(
+            [self.industry_ids.setdefault(occ.get("industry"), len(self.industry_ids))
+             for occ in occupations],
+            dtype=np.int32,
+        )
+
+
+@catalog_cache(maxsize=1)
+def _get_index() -> _SkillIndex:
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM occupations ORDER BY occupation_code")
+        occupations = [dict(row) for row in cursor.fetchall()]
+        cursor.execute("SELECT occupation_code, LOWER(skill_name) AS skill FROM occupation_skills")
+        skill_rows = [(row["occupation_code"], row["skill"]) for row in cursor.fetchall()]
+    return _SkillIndex(occupations, skill_rows)
+
+
+def clear_skill_index() -> None:
+    """Drop the loaded index (reseeds are picked up automatically)"""
+    _get_index.cache_clear()
+
+
+def search_skill_index(
+    skills: NormalizedSkills,
+    limit: int = 10,
+    min_salary: Optional[int] = None,
+    industries: Optional[list[str]] = None,
+) -> list[dict]:
+    """
+    Rank occupations by exact skill overlap.
+
+    Occupations are ordered priority industries first, then match score
+    (matched skills over the occupation's skill count), then median wage,
+    the same ordering search_occupations_by_skill_tokens uses. Preference
+    filters are applied before ranking.
+
+    Args:
+        skills: Normalized skills to match (see normalize_skills)
+        limit: Maximum number of occupations to return
+        min_salary: Optional minimum median wage
+        industries: Optional list of allowed industries
+
+    Returns:
+        Occupation dicts with matching_skills and skill_match_score added
+    """
+    index = _get_index()
+
+    cols = [index.vocab[s] for s in skills if s in index.vocab]
+    if not cols:
+        return []
+
+    matched = np.count_nonzero(index.matrix[:, cols], axis=1)
+    mask = matched > 0
+    if min_salary:
+        mask &= index.wages >= min_salary
+    if industries:
+        wanted = [index.industry_ids[i] for i in industries if i in index.industry_ids]
+        mask &= np.isin(index.industries, wanted)
+    rows = np.flatnonzero(mask)
+    scores = matched[rows] / index.skill_counts[rows]
+
+    # Partition on (priority, score) to drop everything below the limit-th
+    # best before sorting; scores are <= 1, so priority * 2 + score orders
+    # exactly. Ties at the threshold are kept and resolved by the sort below.
+    if 0 < limit < len(rows):
+        primary = index.priority[rows] * 2.0 + scores
+        threshold = np.partition(primary, -limit)[-limit]
+        keep = np.flatnonzero(primary >= threshold)
+        rows, scores = rows[keep], scores[keep]
+
+    # lexsort treats the last key as primary; row order breaks remaining ties
+    order = np.lexsort((rows, -index.wages[rows], -scores, ~index.priority[rows]))[:limit]
+
+    results = []
+    for i in order:
+        result = dict(index.occupations[rows[i]])
+        result["matching_skills"] = int(matched[rows[i]])
+        result["skill_match_score"] = round(float(scores[i]) * 100, 1)
+        results.append(result)
+    return results
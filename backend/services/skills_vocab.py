@@ -0,0 +1,45 @@
+"""
+Skill vocabulary - skill name normalization and stable integer IDs
+
+Set operations on small ints avoid rehashing and comparing skill strings.
+Only catalog skills (from the occupation database) are assigned IDs, so the
+vocabulary stays bounded by the taxonomy size regardless of user input.
+"""
+
+import threading
+from typing import Optional
+
+# Skills that are already stripped, lowercased and deduplicated
+NormalizedSkills = list[str]
+
+_SKILL_IDS: dict[str, int] = {}
+_SKILL_NAMES: list[str] = []
+_LOCK = threading.Lock()
+
+
+def normalize_skills(skills: list[str]) -> NormalizedSkills:
+    """Strip and lowercase skills once, dropping blanks and duplicates (order kept)"""
+    return list(dict.fromkeys(s.strip().lower() for s in skills if s and s.strip()))
+
+
+def skill_id(name: str) -> int:
+    """Get the ID for a normalized catalog skill name, assigning one if new"""
+    sid = _SKILL_IDS.get(name)
+    if sid is None:
+        with _LOCK:
+            sid = _SKILL_IDS.get(name)
+            if sid is None:
+                sid = len(_SKILL_NAMES)
+                _SKILL_NAMES.append(name)
+                _SKILL_IDS[name] = sid
+    return sid
+
+
+def lookup_skill_id(name: str) -> Optional[int]:
+    """Get the ID for a normalized skill name without registering it"""
+    return _SKILL_IDS.get(name)
+
+
+def skill_name(sid: int) -> str:
+    """Get the normalized skill name for an ID"""
+    return _SKILL_NAMES[sid]
@@ -16,7 +16,7 @@ function ResumeGenerator({ profile, skills, career, resume, onResumeGenerated, o
     }
   }, [profile, skills, career, resume]);
 
-  const fetchResume = async (company = null) => {
+  const fetchResume = async (company = null, regenerate = false) => {
     setLoading(true);
     setError(null);
 
@@ -25,7 +25,8 @@ function ResumeGenerator({ profile, skills, career, resume, onResumeGenerated, o
         profile,
         skills,
         career.occupation_title,
-        company
+        company,
+        regenerate
       );
       setCurrentResume(result.resume_text);
       onResumeGenerated(result.resume_text);
@@ -37,7 +38,8 @@ function ResumeGenerator({ profile, skills, career, resume, onResumeGenerated, o
   };
 
   const handleRegenerate = () => {
-    fetchResume(targetCompany || null);
+    // Ask for a fresh resume rather than the cached one for the same inputs
+    fetchResume(targetCompany || null, true);
   };
 
   const handleCopy = async () => {
@@ -88,7 +88,7 @@ export async function getCareerDetails(occupationCode) {
 /**
  * Generate a resume
  */
-export async function generateResume(profile, parsedSkills, targetJob, targetCompany = null) {
+export async function generateResume(profile, parsedSkills, targetJob, targetCompany = null, regenerate = false) {
   return fetchApi('/resume', {
     method: 'POST',
     body: JSON.stringify({
@@ -96,6 +96,7 @@ export async function generateResume(profile, parsedSkills, targetJob, targetCom
       parsed_skills: parsedSkills,
       target_job: targetJob,
       target_company: targetCompany,
+      regenerate,
     }),
   });
 }